@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Arial advance widths
+Advance widths in thousandths of an em of Arial and Arial Bold, which match Helvetica's
+(from the Adobe Core 14 AFM files), so text fits the same on every machine
+"""
+
+# Regular
+ARIAL = {
+    ' ': 278, '!': 278, '"': 355, '#': 556, '$': 556, '%': 889, '&': 667, "'": 191, '(': 333, ')': 333,
+    '*': 389, '+': 584, ',': 278, '-': 333, '.': 278, '/': 278, '0': 556, '1': 556, '2': 556, '3': 556,
+    '4': 556, '5': 556, '6': 556, '7': 556, '8': 556, '9': 556, ':': 278, ';': 278, '<': 584, '=': 584,
+    '>': 584, '?': 556, '@': 1015, 'A': 667, 'B': 667, 'C': 722, 'D': 722, 'E': 667, 'F': 611, 'G': 778,
+    'H': 722, 'I': 278, 'J': 500, 'K': 667, 'L': 556, 'M': 833, 'N': 722, 'O': 778, 'P': 667, 'Q': 778,
+    'R': 722, 'S': 667, 'T': 611, 'U': 722, 'V': 667, 'W': 944, 'X': 667, 'Y': 667, 'Z': 611, '[': 278,
+    '\\': 278, ']': 278, '^': 469, '_': 556, '`': 333, 'a': 556, 'b': 556, 'c': 500, 'd': 556, 'e': 556,
+    'f': 278, 'g': 556, 'h': 556, 'i': 222, 'j': 222, 'k': 500, 'l': 222, 'm': 833, 'n': 556, 'o': 556,
+    'p': 556, 'q': 556, 'r': 333, 's': 500, 't': 278, 'u': 556, 'v': 500, 'w': 722, 'x': 500, 'y': 500,
+    'z': 500, '{': 334, '|': 260, '}': 334, '~': 584, '¡': 333, '¢': 556, '£': 556, '¤': 556, '¥': 556,
+    '¦': 260, '§': 556, '¨': 333, '©': 737, 'ª': 370, '«': 556, '¬': 584, '®': 737, '¯': 333, '°': 400,
+    '±': 584, '²': 333, '³': 333, '´': 333, 'µ': 556, '¶': 537, '·': 278, '¸': 333, '¹': 333, 'º': 365,
+    '»': 556, '¼': 834, '½': 834, '¾': 834, '¿': 611, 'À': 667, 'Á': 667, 'Â': 667, 'Ã': 667, 'Ä': 667,
+    'Å': 667, 'Æ': 1000, 'Ç': 722, 'È': 667, 'É': 667, 'Ê': 667, 'Ë': 667, 'Ì': 278, 'Í': 278, 'Î': 278,
+    'Ï': 278, 'Ð': 722, 'Ñ': 722, 'Ò': 778, 'Ó': 778, 'Ô': 778, 'Õ': 778, 'Ö': 778, '×': 584, 'Ø': 778,
+    'Ù': 722, 'Ú': 722, 'Û': 722, 'Ü': 722, 'Ý': 667, 'Þ': 667, 'ß': 611, 'à': 556, 'á': 556, 'â': 556,
+    'ã': 556, 'ä': 556, 'å': 556, 'æ': 889, 'ç': 500, 'è': 556, 'é': 556, 'ê': 556, 'ë': 556, 'ì': 278,
+    'í': 278, 'î': 278, 'ï': 278, 'ð': 556, 'ñ': 556, 'ò': 556, 'ó': 556, 'ô': 556, 'õ': 556, 'ö': 556,
+    '÷': 584, 'ø': 611, 'ù': 556, 'ú': 556, 'û': 556, 'ü': 556, 'ý': 500, 'þ': 556, 'ÿ': 500, 'Ā': 667,
+    'ā': 556, 'Ă': 667, 'ă': 556, 'Ą': 667, 'ą': 556, 'Ć': 722, 'ć': 500, 'Č': 722, 'č': 500, 'Ď': 722,
+    'ď': 643, 'Đ': 722, 'đ': 556, 'Ē': 667, 'ē': 556, 'Ė': 667, 'ė': 556, 'Ę': 667, 'ę': 556, 'Ě': 667,
+    'ě': 556, 'Ğ': 778, 'ğ': 556, 'Ģ': 778, 'ģ': 556, 'Ī': 278, 'ī': 278, 'Į': 278, 'į': 222, 'İ': 278,
+    'ı': 278, 'Ķ': 667, 'ķ': 500, 'Ĺ': 556, 'ĺ': 222, 'Ļ': 556, 'ļ': 222, 'Ľ': 556, 'ľ': 299, 'Ł': 556,
+    'ł': 222, 'Ń': 722, 'ń': 556, 'Ņ': 722, 'ņ': 556, 'Ň': 722, 'ň': 556, 'Ō': 778, 'ō': 556, 'Ő': 778,
+    'ő': 556, 'Œ': 1000, 'œ': 944, 'Ŕ': 722, 'ŕ': 333, 'Ŗ': 722, 'ŗ': 333, 'Ř': 722, 'ř': 333, 'Ś': 667,
+    'ś': 500, 'Ş': 667, 'ş': 500, 'Š': 667, 'š': 500, 'Ţ': 611, 'ţ': 278, 'Ť': 611, 'ť': 317, 'Ū': 722,
+    'ū': 556, 'Ů': 722, 'ů': 556, 'Ű': 722, 'ű': 556, 'Ų': 722, 'ų': 556, 'Ÿ': 667, 'Ź': 611, 'ź': 500,
+    'Ż': 611, 'ż': 500, 'Ž': 611, 'ž': 500, 'ƒ': 556, 'Ș': 667, 'ș': 500, 'ˆ': 333, 'ˇ': 333, '˘': 333,
+    '˙': 333, '˚': 333, '˛': 333, '˜': 333, '˝': 333, '–': 556, '—': 1000, '‘': 222, '’': 222, '‚': 222,
+    '“': 333, '”': 333, '„': 333, '†': 556, '‡': 556, '•': 350, '…': 1000, '‰': 1000, '‹': 333, '›': 333,
+    '⁄': 167, '™': 1000, '∂': 476, '∆': 612, '∑': 600, '−': 584, '√': 453, '≠': 549, '≤': 549, '≥': 549,
+    '◊': 471, 'ﬁ': 500, 'ﬂ': 500,
+}
+
+# Bold
+ARIAL_BOLD = {
+    ' ': 278, '!': 333, '"': 474, '#': 556, '$': 556, '%': 889, '&': 722, "'": 238, '(': 333, ')': 333,
+    '*': 389, '+': 584, ',': 278, '-': 333, '.': 278, '/': 278, '0': 556, '1': 556, '2': 556, '3': 556,
+    '4': 556, '5': 556, '6': 556, '7': 556, '8': 556, '9': 556, ':': 333, ';': 333, '<': 584, '=': 584,
+    '>': 584, '?': 611, '@': 975, 'A': 722, 'B': 722, 'C': 722, 'D': 722, 'E': 667, 'F': 611, 'G': 778,
+    'H': 722, 'I': 278, 'J': 556, 'K': 722, 'L': 611, 'M': 833, 'N': 722, 'O': 778, 'P': 667, 'Q': 778,
+    'R': 722, 'S': 667, 'T': 611, 'U': 722, 'V': 667, 'W': 944, 'X': 667, 'Y': 667, 'Z': 611, '[': 333,
+    '\\': 278, ']': 333, '^': 584, '_': 556, '`': 333, 'a': 556, 'b': 611, 'c': 556, 'd': 611, 'e': 556,
+    'f': 333, 'g': 611, 'h': 611, 'i': 278, 'j': 278, 'k': 556, 'l': 278, 'm': 889, 'n': 611, 'o': 611,
+    'p': 611, 'q': 611, 'r': 389, 's': 556, 't': 333, 'u': 611, 'v': 556, 'w': 778, 'x': 556, 'y': 556,
+    'z': 500, '{': 389, '|': 280, '}': 389, '~': 584, '¡': 333, '¢': 556, '£': 556, '¤': 556, '¥': 556,
+    '¦': 280, '§': 556, '¨': 333, '©': 737, 'ª': 370, '«': 556, '¬': 584, '®': 737, '¯': 333, '°': 400,
+    '±': 584, '²': 333, '³': 333, '´': 333, 'µ': 611, '¶': 556, '·': 278, '¸': 333, '¹': 333, 'º': 365,
+    '»': 556, '¼': 834, '½': 834, '¾': 834, '¿': 611, 'À': 722, 'Á': 722, 'Â': 722, 'Ã': 722, 'Ä': 722,
+    'Å': 722, 'Æ': 1000, 'Ç': 722, 'È': 667, 'É': 667, 'Ê': 667, 'Ë': 667, 'Ì': 278, 'Í': 278, 'Î': 278,
+    'Ï': 278, 'Ð': 722, 'Ñ': 722, 'Ò': 778, 'Ó': 778, 'Ô': 778, 'Õ': 778, 'Ö': 778, '×': 584, 'Ø': 778,
+    'Ù': 722, 'Ú': 722, 'Û': 722, 'Ü': 722, 'Ý': 667, 'Þ': 667, 'ß': 611, 'à': 556, 'á': 556, 'â': 556,
+    'ã': 556, 'ä': 556, 'å': 556, 'æ': 889, 'ç': 556, 'è': 556, 'é': 556, 'ê': 556, 'ë': 556, 'ì': 278,
+    'í': 278, 'î': 278, 'ï': 278, 'ð': 611, 'ñ': 611, 'ò': 611, 'ó': 611, 'ô': 611, 'õ': 611, 'ö': 611,
+    '÷': 584, 'ø': 611, 'ù': 611, 'ú': 611, 'û': 611, 'ü': 611, 'ý': 556, 'þ': 611, 'ÿ': 556, 'Ā': 722,
+    'ā': 556, 'Ă': 722, 'ă': 556, 'Ą': 722, 'ą': 556, 'Ć': 722, 'ć': 556, 'Č': 722, 'č': 556, 'Ď': 722,
+    'ď': 743, 'Đ': 722, 'đ': 611, 'Ē': 667, 'ē': 556, 'Ė': 667, 'ė': 556, 'Ę': 667, 'ę': 556, 'Ě': 667,
+    'ě': 556, 'Ğ': 778, 'ğ': 611, 'Ģ': 778, 'ģ': 611, 'Ī': 278, 'ī': 278, 'Į': 278, 'į': 278, 'İ': 278,
+    'ı': 278, 'Ķ': 722, 'ķ': 556, 'Ĺ': 611, 'ĺ': 278, 'Ļ': 611, 'ļ': 278, 'Ľ': 611, 'ľ': 400, 'Ł': 611,
+    'ł': 278, 'Ń': 722, 'ń': 611, 'Ņ': 722, 'ņ': 611, 'Ň': 722, 'ň': 611, 'Ō': 778, 'ō': 611, 'Ő': 778,
+    'ő': 611, 'Œ': 1000, 'œ': 944, 'Ŕ': 722, 'ŕ': 389, 'Ŗ': 722, 'ŗ': 389, 'Ř': 722, 'ř': 389, 'Ś': 667,
+    'ś': 556, 'Ş': 667, 'ş': 556, 'Š': 667, 'š': 556, 'Ţ': 611, 'ţ': 333, 'Ť': 611, 'ť': 389, 'Ū': 722,
+    'ū': 611, 'Ů': 722, 'ů': 611, 'Ű': 722, 'ű': 611, 'Ų': 722, 'ų': 611, 'Ÿ': 667, 'Ź': 611, 'ź': 500,
+    'Ż': 611, 'ż': 500, 'Ž': 611, 'ž': 500, 'ƒ': 556, 'Ș': 667, 'ș': 556, 'ˆ': 333, 'ˇ': 333, '˘': 333,
+    '˙': 333, '˚': 333, '˛': 333, '˜': 333, '˝': 333, '–': 556, '—': 1000, '‘': 278, '’': 278, '‚': 278,
+    '“': 500, '”': 500, '„': 500, '†': 556, '‡': 556, '•': 350, '…': 1000, '‰': 1000, '‹': 333, '›': 333,
+    '⁄': 167, '™': 1000, '∂': 494, '∆': 612, '∑': 600, '−': 584, '√': 549, '≠': 549, '≤': 549, '≥': 549,
+    '◊': 494, 'ﬁ': 611, 'ﬂ': 611,
+}
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Image asset index
+Reads pixel size, EXIF orientation and transparency from JPEG/PNG headers without
+decoding pixels, for a whole image folder at once, cached on disk by mtime
+"""
+
+from dataclasses import dataclass
+import json
+import os
+import struct
+import sys
+import time
+
+# Index location
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+IMAGES_PATH = os.path.join(BASE_PATH, "images")
+INDEX_PATH = os.path.join(BASE_PATH, ".cache", "asset_index.json")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ORIENTATION_TAG = 0x0112
+# JPEG start-of-frame markers carrying the image size (not DHT, JPG or DAC)
+SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+@dataclass(frozen=True)
+class ImageInfo:
+    width: int
+    height: int
+    orientation: int = 1
+    alpha: bool = False
+
+    @property
+    def oriented_size(self):
+        """Pixel size after applying the EXIF orientation"""
+        # Orientations 5-8 are rotated by 90 degrees and swap width and height
+        if self.orientation in (5, 6, 7, 8):
+            return self.height, self.width
+        return self.width, self.height
+
+# Probed files as {full path: (mtime_ns, size, ImageInfo)}; loaded on first lookup
+_index = None
+_dirty = False
+
+def probe(path):
+    """ImageInfo from the headers of a JPEG or PNG file; raises ValueError otherwise"""
+    with open(path, "rb") as f:
+        head = f.read(8)
+        f.seek(0)
+        if head[:2] == b"\xff\xd8":
+            return _probe_jpeg(f)
+        if head == PNG_SIGNATURE:
+            return _probe_png(f)
+    raise ValueError(f"{path}: not a JPEG or PNG file")
+
+def _probe_jpeg(f):
+    f.read(2)
+    orientation = 1
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError("JPEG without a frame header")
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        code = marker[0] if marker else 0xD9
+        if code == 0xD9 or code == 0xDA:
+            raise ValueError("JPEG without a frame header")
+        if code == 0x01 or 0xD0 <= code <= 0xD7:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if code in SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return ImageInfo(width, height, orientation)
+        segment = f.read(length - 2)
+        if code == 0xE1 and segment[:6] == b"Exif\x00\x00":
+            orientation = _exif_orientation(segment[6:])
+
+def _exif_orientation(tiff):
+    """Orientation tag of the first IFD of a TIFF/EXIF block, 1 if absent or unreadable"""
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None or len(tiff) < 8:
+        return 1
+    offset = struct.unpack(order + "I", tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return 1
+    count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+    for i in range(count):
+        entry = tiff[offset + 2 + i * 12:offset + 14 + i * 12]
+        if len(entry) < 12:
+            break
+        tag, kind = struct.unpack(order + "HH", entry[:4])
+        if tag == ORIENTATION_TAG and kind == 3:
+            value = struct.unpack(order + "H", entry[8:10])[0]
+            return value if 1 <= value <= 8 else 1
+    return 1
+
+def _probe_png(f):
+    f.read(8)
+    length, kind = struct.unpack(">I4s", f.read(8))
+    if kind != b"IHDR":
+        raise ValueError("PNG without IHDR")
+    width, height, _, color_type = struct.unpack(">IIBB", f.read(10))
+    f.seek(length - 10 + 4, os.SEEK_CUR)
+    # Palette images are transparent when a tRNS chunk precedes the image data
+    alpha = color_type in (4, 6)
+    while color_type == 3:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, kind = struct.unpack(">I4s", header)
+        if kind in (b"tRNS", b"IDAT"):
+            alpha = kind == b"tRNS"
+            break
+        f.seek(length + 4, os.SEEK_CUR)
+    return ImageInfo(width, height, 1, alpha)
+
+def load_index(root=IMAGES_PATH):
+    """Index every image below root in one scan, reusing cached entries whose mtime and size match
+
+    Cached entries for images outside root, probed by earlier lookups, are kept while unchanged.
+    """
+    global _index, _dirty
+    cached = {}
+    try:
+        with open(INDEX_PATH, encoding="utf-8") as f:
+            for rel_path, (mtime_ns, size, width, height, orientation, alpha) in json.load(f).items():
+                info = ImageInfo(width, height, orientation, alpha)
+                cached[os.path.join(BASE_PATH, rel_path)] = (mtime_ns, size, info)
+    except (OSError, ValueError, TypeError):
+        pass
+    _index = {}
+    for full_path, stat in _walk(root):
+        entry = cached.get(full_path)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            _index[full_path] = entry
+        else:
+            _store(full_path, stat)
+    # Images elsewhere that builds probed and saved stay while they are unchanged
+    for full_path, entry in cached.items():
+        if full_path in _index or full_path.startswith(os.path.join(root, "")):
+            continue
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            continue
+        if entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            _index[full_path] = entry
+    _dirty = _dirty or set(_index) != set(cached)
+    save_index()
+    return _index
+
+def lookup(full_path):
+    """ImageInfo for an image file, or None if it is missing or not a readable image"""
+    if _index is None:
+        load_index()
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        return None
+    entry = _index.get(full_path)
+    if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+        entry = _store(full_path, stat)
+    return entry[2] if entry else None
+
+def save_index():
+    """Write the index to disk if lookups added or refreshed entries
+
+    load_index saves after its scan; builds call this again when they finish, so
+    images probed later (outside images/, or changed during a watch) are kept too.
+    """
+    global _dirty
+    if not _dirty or _index is None:
+        return
+    data = {os.path.relpath(path, BASE_PATH):
+            [mtime_ns, size, info.width, info.height, info.orientation, info.alpha]
+            for path, (mtime_ns, size, info) in sorted(_index.items()) if info is not None}
+    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
+    tmp_path = INDEX_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, INDEX_PATH)
+    _dirty = False
+
+def _store(full_path, stat):
+    global _dirty
+    try:
+        info = probe(full_path)
+    except (OSError, ValueError, struct.error):
+        info = None
+    _index[full_path] = (stat.st_mtime_ns, stat.st_size, info)
+    _dirty = True
+    return _index[full_path] if info else None
+
+def _walk(root):
+    """Yield (full path, stat) of every JPEG/PNG file below root"""
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                stack.append(entry.path)
+            elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield entry.path, entry.stat()
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    index = load_index(sys.argv[1] if len(sys.argv) > 1 else IMAGES_PATH)
+    elapsed = (time.perf_counter() - start) * 1000
+    broken = [path for path, entry in index.items() if entry[2] is None]
+    for path in broken:
+        print(f"❌ Unreadable image: {os.path.relpath(path, BASE_PATH)}")
+    print(f"✅ Indexed {len(index) - len(broken)} images in {elapsed:.1f} ms")
+    sys.exit(1 if broken else 0)
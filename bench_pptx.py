@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Deck generation benchmark
+Times deck generation end to end and per slide, records peak memory and output size,
+and checks the results against a stored JSON baseline
+"""
+
+from contextlib import redirect_stdout
+from create_pptx import BASE_PATH, build_slides, create_presentation, new_presentation, render_slide, theme_layouts
+from deck_spec import DEFAULT_SPEC, load_deck
+import argparse
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+BASELINE_PATH = os.path.join(BASE_PATH, "benchmarks", "baseline.json")
+
+# Allowed growth over the baseline before a metric counts as a regression
+TIME_THRESHOLD = 0.5
+MEMORY_THRESHOLD = 0.25
+SIZE_THRESHOLD = 0.05
+# Hard ceiling for the saved deck, whatever the baseline says
+MAX_SIZE_MB = 5
+
+def time_deck(deck, templates):
+    """Seconds to build deck in memory and to save it, as (build, save)"""
+    start = time.perf_counter()
+    prs = new_presentation(deck)
+    build_slides(prs, deck, range(len(deck.slides)), templates)
+    built = time.perf_counter()
+    prs.save(io.BytesIO())
+    return built - start, time.perf_counter() - built
+
+def bench_templates(deck, runs):
+    """Build deck runs times per mode and return {mode: [(build, save), ...]}"""
+    # Warm up image cache and template cache so only generation is measured
+    time_deck(deck, True)
+    time_deck(deck, False)
+    results = {"api": [], "templates": []}
+    for _ in range(runs):
+        results["api"].append(time_deck(deck, False))
+        results["templates"].append(time_deck(deck, True))
+    return results
+
+def print_results(results):
+    """Print median build/save/total time per mode in milliseconds"""
+    print(f"{'mode':<12}{'build ms':>10}{'save ms':>10}{'total ms':>10}")
+    medians = {}
+    for mode, samples in results.items():
+        build = statistics.median(b for b, _ in samples) * 1000
+        save = statistics.median(s for _, s in samples) * 1000
+        medians[mode] = build + save
+        print(f"{mode:<12}{build:>10.1f}{save:>10.1f}{build + save:>10.1f}")
+    print(f"speedup     {medians['api'] / medians['templates']:>29.2f}x")
+
+def time_presentation(spec_path, output_path):
+    """Seconds for one full create_presentation() run writing output_path"""
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        create_presentation(spec_path, output_path, incremental=False)
+    return time.perf_counter() - start
+
+def time_slides(deck):
+    """Seconds to add and render each slide of deck, in order"""
+    prs = new_presentation(deck)
+    layouts = theme_layouts(prs)
+    times = []
+    for i, model in enumerate(deck.slides):
+        start = time.perf_counter()
+        slide = prs.slides.add_slide(layouts[model.background])
+        render_slide(slide, model, i + 1, len(deck.slides))
+        times.append(time.perf_counter() - start)
+    return times
+
+def peak_memory(spec_path, output_path):
+    """Peak Python heap allocation in bytes during one create_presentation() run (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        with redirect_stdout(io.StringIO()):
+            create_presentation(spec_path, output_path, incremental=False)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def size_breakdown(deck, output_path):
+    """Compressed bytes of the saved deck per slide (XML and rels) and per media part"""
+    slides = {model.name: 0 for model in deck.slides}
+    media = {}
+    other = 0
+    with zipfile.ZipFile(output_path) as zf:
+        for info in zf.infolist():
+            match = re.match(r"ppt/slides/(?:_rels/)?slide(\d+)\.xml", info.filename)
+            if match:
+                slides[deck.slides[int(match.group(1)) - 1].name] += info.compress_size
+            elif info.filename.startswith("ppt/media/"):
+                media[info.filename] = info.compress_size
+            else:
+                other += info.compress_size
+    return {"total": os.path.getsize(output_path), "slides": slides, "media": media, "other": other}
+
+def bench_deck(spec_path, runs):
+    """Benchmark generation of the deck in spec_path and return the results as a dict"""
+    deck = load_deck(spec_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Own output name so the build manifest of the real deck is left alone
+        output_path = os.path.join(tmp, "bench_" + deck.output)
+        # Warm up image cache and template cache so only generation is measured
+        time_presentation(spec_path, output_path)
+        totals = [time_presentation(spec_path, output_path) for _ in range(runs)]
+        per_slide = [time_slides(deck) for _ in range(runs)]
+        peak = peak_memory(spec_path, output_path)
+        size = size_breakdown(deck, output_path)
+    return {
+        "deck": deck.name,
+        "runs": runs,
+        "total_ms": round(statistics.median(totals) * 1000, 2),
+        "slides_ms": {model.name: round(statistics.median(t[i] for t in per_slide) * 1000, 2)
+                      for i, model in enumerate(deck.slides)},
+        "peak_memory_kb": round(peak / 1024),
+        "size": size,
+    }
+
+def print_report(results):
+    """Print timings, peak memory and size breakdown of bench_deck() results"""
+    size = results["size"]
+    print(f"📊 {results['deck']}: {results['total_ms']:.1f} ms per deck (median of {results['runs']}), "
+          f"peak memory {results['peak_memory_kb'] / 1024:.1f} MB, {size['total'] / 1024:.0f} KB on disk")
+    print(f"{'slide':<16}{'ms':>8}{'KB':>8}")
+    for name, ms in results["slides_ms"].items():
+        print(f"{name:<16}{ms:>8.1f}{size['slides'][name] / 1024:>8.1f}")
+    print(f"{'media':<16}{'':>8}{sum(size['media'].values()) / 1024:>8.1f}")
+    for name, n in sorted(size["media"].items(), key=lambda item: -item[1]):
+        print(f"  {os.path.basename(name):<14}{'':>8}{n / 1024:>8.1f}")
+    print(f"{'other parts':<16}{'':>8}{size['other'] / 1024:>8.1f}")
+
+def regressions(baseline, results, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD,
+                size_threshold=SIZE_THRESHOLD, max_size_mb=MAX_SIZE_MB):
+    """Messages for every metric in results that grew past its threshold over baseline"""
+    checks = [
+        ("total time", baseline["total_ms"], results["total_ms"], time_threshold, "ms"),
+        ("peak memory", baseline["peak_memory_kb"], results["peak_memory_kb"], memory_threshold, "KB"),
+        ("deck size", baseline["size"]["total"], results["size"]["total"], size_threshold, "B"),
+        ("media size", sum(baseline["size"]["media"].values()), sum(results["size"]["media"].values()),
+         size_threshold, "B"),
+    ]
+    for name, old in baseline["size"]["slides"].items():
+        if name in results["size"]["slides"]:
+            checks.append((f"slide {name} size", old, results["size"]["slides"][name], size_threshold, "B"))
+    failures = []
+    for label, old, new, threshold, unit in checks:
+        if old and new > old * (1 + threshold):
+            failures.append(f"{label}: {new:.10g} {unit} vs baseline {old:.10g} {unit} "
+                            f"(+{(new / old - 1) * 100:.0f}%, limit +{threshold * 100:.0f}%)")
+    if results["size"]["total"] > max_size_mb * 1024 * 1024:
+        failures.append(f"deck size: {results['size']['total'] / 1024 / 1024:.1f} MB exceeds {max_size_mb} MB")
+    return failures
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TALIJA deck generation")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("-n", "--runs", type=int, default=20, help="builds per measurement (default: 20)")
+    parser.add_argument("--templates", action="store_true",
+                        help="only compare build time with and without shape XML templates")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with an error if a metric regressed")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD,
+                        help=f"allowed time growth as a fraction (default: {TIME_THRESHOLD})")
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD,
+                        help=f"allowed peak memory growth as a fraction (default: {MEMORY_THRESHOLD})")
+    parser.add_argument("--size-threshold", type=float, default=SIZE_THRESHOLD,
+                        help=f"allowed size growth as a fraction (default: {SIZE_THRESHOLD})")
+    parser.add_argument("--max-size-mb", type=float, default=MAX_SIZE_MB,
+                        help=f"fail above this deck size whatever the baseline (default: {MAX_SIZE_MB})")
+    args = parser.parse_args()
+
+    if args.templates:
+        print_results(bench_templates(load_deck(args.spec), args.runs))
+        sys.exit()
+
+    results = bench_deck(args.spec, args.runs)
+    print_report(results)
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"❌ No baseline at {args.baseline}; run with --save first")
+        failures = regressions(load_baseline(args.baseline), results, args.time_threshold,
+                               args.memory_threshold, args.size_threshold, args.max_size_mb)
+        if failures:
+            print("❌ Regressions against baseline:", file=sys.stderr)
+            for failure in failures:
+                print(f"   {failure}", file=sys.stderr)
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"✅ Baseline saved to: {args.baseline}")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Static site build
+Minifies CSS and JS, names assets after their content hash, makes page images responsive,
+writes precompressed .gz/.br siblings and bumps sitemap <lastmod> only for changed pages
+"""
+
+from image_cache import BASE_PATH, CACHE_PATH
+from site_images import SITE_PATH, missing_encoders, rewrite_page, slug
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_PATH = os.path.join(CACHE_PATH, "site_manifest.json")
+# Page hashes and lastmod dates; tracked, so fresh checkouts (CI) see which pages changed
+PAGE_STATE_PATH = os.path.join(BASE_PATH, "sitemap_state.json")
+
+# Site sources, relative to the repository
+PAGES = ("index.html", "presentation.html")
+STATIC_FILES = ("robots.txt", "CNAME")
+SITEMAP = "sitemap.xml"
+
+# Hex digits of the content hash in fingerprinted names, e.g. css/main.3f2a9c1b0d7e.css
+HASH_NAME_LENGTH = 12
+
+# Precompression; tiny files gain nothing and are served as they are
+COMPRESSED_EXTENSIONS = (".html", ".css", ".js", ".xml", ".txt", ".svg")
+COMPRESS_MIN_SIZE = 512
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Local stylesheets and scripts referenced by a page
+ASSET_PATTERN = re.compile(r"""(<(?:link|script)\b[^>]*?\b(?:href|src)\s*=\s*["'])([^"'#?:]+\.(?:css|js))(["'])""",
+                           re.IGNORECASE)
+STYLE_PATTERN = re.compile(r"(<style\b[^>]*>)(.*?)(</style>)", re.IGNORECASE | re.DOTALL)
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+CSS_TOKEN_PATTERN = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/|\s+|[{};]|[^"'/\s{};]+|/""",
+                               re.DOTALL)
+JS_TOKEN_PATTERN = re.compile(r""""(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`|//[^\n]*|/\*.*?\*/|"""
+                              r"""[^"'`/]+|/""", re.DOTALL)
+# A slash after one of these starts a regular expression literal, not a division
+JS_REGEX_PREFIX = tuple("(,=:[!&|?{};+-*%<>~^") + ("return", "typeof")
+JS_REGEX_PATTERN = re.compile(r"/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n])+/[a-z]*")
+SITEMAP_URL_PATTERN = re.compile(r"<url>.*?</url>", re.DOTALL)
+LOC_PATTERN = re.compile(r"<loc>\s*([^<]+?)\s*</loc>")
+LASTMOD_PATTERN = re.compile(r"<lastmod>\s*([^<]+?)\s*</lastmod>")
+
+def minify_css(css):
+    """CSS without comments and without whitespace the syntax does not need"""
+    out = []
+    for match in CSS_TOKEN_PATTERN.finditer(css):
+        token = match.group(0)
+        if token.startswith("/*"):
+            continue
+        if token.isspace():
+            following = css[match.end():match.end() + 1]
+            # Keep one space between words ("0 auto", "and (", "a .b"), none next to punctuation
+            if out and out[-1][-1] not in " {};,>:" and following not in "{};,>":
+                out.append(" ")
+            continue
+        if token == "}" and out and out[-1] == ";":
+            out.pop()
+        out.append(token)
+    return "".join(out).strip()
+
+def minify_js(js):
+    """JavaScript without comments, indentation or blank lines
+
+    Line breaks are kept, so code relying on automatic semicolon insertion still works.
+    """
+    out = []
+    # Code before the current token, without trailing whitespace
+    previous = ""
+    position = 0
+    while position < len(js):
+        token = JS_TOKEN_PATTERN.match(js, position).group(0)
+        if token == "/":
+            regex = JS_REGEX_PATTERN.match(js, position)
+            if regex and (not previous or previous.endswith(JS_REGEX_PREFIX)):
+                token = regex.group(0)
+        position += len(token)
+        if token.startswith("//"):
+            continue
+        if token.startswith("/*"):
+            out.append("\n" if "\n" in token else " ")
+            continue
+        out.append(token)
+        previous = token.rstrip() or previous
+    lines = (line.strip() for line in "".join(out).split("\n"))
+    return "\n".join(line for line in lines if line) + "\n"
+
+def fingerprint(rel_path, data):
+    """rel_path with a content hash before the extension and a URL-safe stem"""
+    folder, name = posixpath.split(rel_path)
+    stem, ext = posixpath.splitext(name)
+    digest = hashlib.sha256(data).hexdigest()[:HASH_NAME_LENGTH]
+    return posixpath.join(folder, f"{slug(stem)}.{digest}{ext.lower()}")
+
+def build_assets(pages):
+    """{source path: output path} and {output path: bytes} of the stylesheets and scripts pages use"""
+    names = {}
+    outputs = {}
+    for page in pages:
+        with open(os.path.join(BASE_PATH, page), encoding="utf-8") as f:
+            markup = f.read()
+        for match in ASSET_PATTERN.finditer(markup):
+            rel_path = posixpath.normpath(posixpath.join(posixpath.dirname(page), match.group(2)))
+            full_path = os.path.join(BASE_PATH, *rel_path.split("/"))
+            if rel_path in names or not os.path.isfile(full_path):
+                continue
+            with open(full_path, encoding="utf-8") as f:
+                source = f.read()
+            if rel_path.endswith(".css"):
+                data = minify_css(_rewrite_css_urls(source, rel_path, names, outputs)).encode("utf-8")
+            else:
+                data = minify_js(source).encode("utf-8")
+            names[rel_path] = fingerprint(rel_path, data)
+            outputs[names[rel_path]] = data
+    return names, outputs
+
+def _rewrite_css_urls(css, rel_path, names, outputs):
+    """Point url() references to local files at fingerprinted copies"""
+    folder = posixpath.dirname(rel_path)
+
+    def replace(match):
+        url = match.group(2).strip()
+        if re.match(r"^([a-z][a-z0-9+.-]*:|//|#)", url, re.IGNORECASE):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(folder, url.split("?")[0]))
+        full_path = os.path.join(BASE_PATH, *target.split("/"))
+        if not os.path.isfile(full_path):
+            return match.group(0)
+        if target not in names:
+            with open(full_path, "rb") as f:
+                data = f.read()
+            names[target] = fingerprint(target, data)
+            outputs[names[target]] = data
+        return f"url({posixpath.relpath(names[target], folder or '.')})"
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+def build_page(page, asset_names, asset_outputs, output_dir, jobs=1):
+    """Built markup of one page: responsive images and fingerprinted asset references
+
+    Files that inline <style> blocks reference through url(), such as web fonts, are
+    fingerprinted into asset_names and asset_outputs like those of stylesheets.
+    """
+    full_page = os.path.join(BASE_PATH, page)
+    with open(full_page, encoding="utf-8") as f:
+        markup = f.read()
+    markup, _ = rewrite_page(markup, os.path.dirname(full_page), output_dir, jobs)
+    markup = STYLE_PATTERN.sub(lambda m: m.group(1) + _rewrite_css_urls(m.group(2), page, asset_names, asset_outputs)
+                               + m.group(3), markup)
+    folder = posixpath.dirname(page)
+
+    def replace(match):
+        rel_path = posixpath.normpath(posixpath.join(folder, match.group(2)))
+        if rel_path not in asset_names:
+            return match.group(0)
+        return match.group(1) + posixpath.relpath(asset_names[rel_path], folder or ".") + match.group(3)
+
+    return ASSET_PATTERN.sub(replace, markup)
+
+def update_sitemap(sitemap, page_hashes, recorded, today):
+    """Sitemap with <lastmod> set to today for pages whose hash differs from the recorded one
+
+    recorded is {page: [hash, lastmod]} from the previous build; pages seen for the first
+    time keep the sitemap's date. Returns (sitemap, {page: [hash, lastmod]}).
+    """
+    state = {}
+
+    def replace(match):
+        entry = match.group(0)
+        loc = LOC_PATTERN.search(entry)
+        page = _page_for_url(loc.group(1)) if loc else None
+        if page not in page_hashes:
+            return entry
+        lastmod_match = LASTMOD_PATTERN.search(entry)
+        lastmod = lastmod_match.group(1) if lastmod_match else ""
+        previous = recorded.get(page)
+        if previous is None:
+            lastmod = lastmod or today
+        elif previous[0] != page_hashes[page]:
+            lastmod = today
+        else:
+            # A date edited by hand after the last build wins
+            lastmod = max(lastmod, previous[1])
+        state[page] = [page_hashes[page], lastmod]
+        if lastmod_match:
+            return entry[:lastmod_match.start(1)] + lastmod + entry[lastmod_match.end(1):]
+        return entry[:loc.end()] + f"\n    <lastmod>{lastmod}</lastmod>" + entry[loc.end():]
+
+    return SITEMAP_URL_PATTERN.sub(replace, sitemap), state
+
+def _page_for_url(url):
+    """Page file a sitemap URL is served from, e.g. https://host/ -> index.html"""
+    path = re.sub(r"^[a-z]+://[^/]+", "", url).split("?")[0].split("#")[0].lstrip("/")
+    return path + "index.html" if not path or path.endswith("/") else path
+
+def compressed_variants(rel_path, data):
+    """{suffix: bytes} of the precompressed siblings of one output file"""
+    if not rel_path.endswith(COMPRESSED_EXTENSIONS) or len(data) < COMPRESS_MIN_SIZE:
+        return {}
+    # mtime=0 keeps .gz files byte-identical between builds
+    variants = {".gz": gzip.compress(data, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+    return variants
+
+def load_manifest():
+    """Previous build's {path: [hash, siblings]} of files written to the output folder"""
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return dict(json.load(f)["files"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+def save_manifest(files):
+    _write_json(MANIFEST_PATH, {"files": files})
+
+def load_page_state():
+    """{page: [hash, lastmod]} recorded by the last build, from the tracked state file"""
+    try:
+        with open(PAGE_STATE_PATH, encoding="utf-8") as f:
+            return dict(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return {}
+
+def save_page_state(state):
+    """Write the page state file, leaving it untouched if nothing changed"""
+    if state != load_page_state():
+        _write_json(PAGE_STATE_PATH, state)
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+def write_outputs(outputs, output_dir, previous):
+    """Write changed files and their .gz/.br siblings, skipping files the last build wrote unchanged
+
+    Returns ({path: [hash, siblings]}, written count).
+    """
+    files = {}
+    written = 0
+    for rel_path, data in sorted(outputs.items()):
+        digest = hashlib.sha256(data).hexdigest()
+        full_path = os.path.join(output_dir, *rel_path.split("/"))
+        entry = previous.get(rel_path)
+        if entry and entry[0] == digest and all(os.path.exists(full_path + s) for s in [""] + entry[1]):
+            files[rel_path] = entry
+            continue
+        variants = compressed_variants(rel_path, data)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        for suffix, content in [("", data)] + sorted(variants.items()):
+            tmp_path = f"{full_path}{suffix}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, full_path + suffix)
+        files[rel_path] = [digest, sorted(variants)]
+        written += 1
+    return files, written
+
+def prune(output_dir, previous, files):
+    """Delete outputs of the previous build that this build no longer produces"""
+    for rel_path, (_, suffixes) in previous.items():
+        if rel_path in files:
+            continue
+        for suffix in [""] + suffixes:
+            try:
+                os.remove(os.path.join(output_dir, *rel_path.split("/")) + suffix)
+            except OSError:
+                pass
+
+def build_site(output_dir=SITE_PATH, pages=PAGES, jobs=1, today=None):
+    """Build the site into output_dir, returns (written, unchanged) file counts
+
+    Page hashes and <lastmod> dates are kept in sitemap_state.json; commit it with
+    the site so later builds, on any checkout, bump only pages that changed since.
+    """
+    today = today or datetime.date.today().isoformat()
+    previous_files = load_manifest()
+    previous_pages = load_page_state()
+    asset_names, outputs = build_assets(pages)
+    page_hashes = {}
+    for page in pages:
+        data = build_page(page, asset_names, outputs, output_dir, jobs).encode("utf-8")
+        outputs[page] = data
+        page_hashes[page] = hashlib.sha256(data).hexdigest()
+    for rel_path in STATIC_FILES:
+        with open(os.path.join(BASE_PATH, rel_path), "rb") as f:
+            outputs[rel_path] = f.read()
+    with open(os.path.join(BASE_PATH, SITEMAP), encoding="utf-8") as f:
+        sitemap, page_state = update_sitemap(f.read(), page_hashes, previous_pages, today)
+    outputs[SITEMAP] = sitemap.encode("utf-8")
+    files, written = write_outputs(outputs, output_dir, previous_files)
+    prune(output_dir, previous_files, files)
+    save_manifest(files)
+    save_page_state({**previous_pages, **page_state})
+    return written, len(files) - written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the TALIJA site with fingerprinted, precompressed assets")
+    parser.add_argument("-o", "--output-dir", default=SITE_PATH, help="output folder (default: dist/)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for image encoding (default: 1)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if brotli is None:
+        print("⚠️  brotli is not installed, only .gz files are written (pip install brotli)", file=sys.stderr)
+    if missing_encoders():
+        print(f"⚠️  Pillow cannot write {', '.join(missing_encoders())}, those image sources are left out "
+              f"(pip install -U pillow)", file=sys.stderr)
+    try:
+        written, unchanged = build_site(args.output_dir, jobs=args.jobs)
+    except (OSError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ Site built in {args.output_dir}: {written} files written, {unchanged} unchanged")
+    print(f"⏱️  {time.perf_counter() - start:.2f}s")
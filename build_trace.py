@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Build tracing
+Opt-in timing, allocation and call-count instrumentation for deck builds,
+written as a JSON summary or a Chrome trace (chrome://tracing, Perfetto)
+"""
+
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Active tracer; None keeps every hook down to a single check
+_tracer = None
+
+class Tracer:
+    """Collects spans, helper call statistics and per-span counters for one build"""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.helpers = {}
+        self._stack = []
+
+    def open(self, name, category, peak):
+        span = {"name": name, "cat": category, "start": time.perf_counter(), "args": {}}
+        if self.memory:
+            if peak:
+                tracemalloc.reset_peak()
+            span["mem_start"] = tracemalloc.get_traced_memory()[0]
+            span["peak"] = peak
+        self._stack.append(span)
+        return span
+
+    def close(self, span):
+        end = time.perf_counter()
+        self._stack.remove(span)
+        span["dur"] = end - span.pop("start")
+        span["ts"] = end - span["dur"] - self.origin
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            span["args"]["alloc_kb"] = round((current - span.pop("mem_start")) / 1024, 1)
+            if span.pop("peak"):
+                span["args"]["peak_kb"] = round(peak / 1024, 1)
+        self.spans.append(span)
+
+    def count(self, key, amount=1):
+        """Add amount to a counter on the innermost open span"""
+        if self._stack:
+            args = self._stack[-1]["args"]
+            args[key] = args.get(key, 0) + amount
+
+    def record_call(self, name, seconds, calls=1):
+        stats = self.helpers.setdefault(name, {"calls": 0, "total_ms": 0.0})
+        stats["calls"] += calls
+        stats["total_ms"] += seconds * 1000
+
+    def export(self):
+        """Finished spans and helper statistics as plain data for merge in another process
+
+        Span starts are on the perf_counter clock, which worker processes share with
+        their parent.
+        """
+        return {"pid": os.getpid(), "spans": [{**s, "ts": s["ts"] + self.origin} for s in self.spans],
+                "helpers": self.helpers}
+
+    def merge(self, exported):
+        """Add the spans and helper statistics a worker process exported to this trace"""
+        for s in exported["spans"]:
+            self.spans.append({**s, "ts": s["ts"] - self.origin, "pid": exported["pid"]})
+        for name, stats in exported["helpers"].items():
+            self.record_call(name, stats["total_ms"] / 1000, stats["calls"])
+
+    def summary(self):
+        """Plain JSON trace: spans in start order and per-helper call statistics"""
+        spans = sorted(self.spans, key=lambda s: s["ts"])
+        return {
+            "spans": [{"name": s["name"], "cat": s["cat"], "start_ms": round(s["ts"] * 1000, 3),
+                       "ms": round(s["dur"] * 1000, 3), **({"pid": s["pid"]} if "pid" in s else {}),
+                       **s["args"]} for s in spans],
+            "helpers": {name: {"calls": stats["calls"], "total_ms": round(stats["total_ms"], 3)}
+                        for name, stats in sorted(self.helpers.items())},
+        }
+
+    def chrome_events(self):
+        """Spans as complete ("X") events of the Chrome trace event format, one row per process"""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        return [{"name": s["name"], "cat": s["cat"], "ph": "X", "pid": s.get("pid", pid), "tid": tid,
+                 "ts": round(s["ts"] * 1e6, 1), "dur": round(s["dur"] * 1e6, 1), "args": s["args"]}
+                for s in sorted(self.spans, key=lambda s: s["ts"])]
+
+    def write(self, path, chrome=None):
+        """Write the trace to path; Chrome format if chrome or path ends in .trace.json"""
+        if chrome is None:
+            chrome = path.endswith(".trace.json")
+        if chrome:
+            data = {"traceEvents": self.chrome_events(), "displayTimeUnit": "ms",
+                    "otherData": {"helpers": self.summary()["helpers"]}}
+        else:
+            data = self.summary()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=None if chrome else 2, ensure_ascii=False)
+
+def start(memory=True):
+    """Enable tracing for the rest of the process (or until stop) and return the tracer"""
+    global _tracer
+    _tracer = Tracer(memory)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _tracer
+
+def stop():
+    """Disable tracing and return the tracer that was active"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer and tracer.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return tracer
+
+def active():
+    """The tracer in use, or None when not tracing"""
+    return _tracer
+
+def merge(exported):
+    """Add a worker process's exported trace to the active one, if tracing"""
+    if _tracer is not None and exported is not None:
+        _tracer.merge(exported)
+
+@contextmanager
+def span(name, category="build", peak=False):
+    """Time the enclosed block as one span; peak also records peak memory within it"""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    opened = tracer.open(name, category, peak)
+    try:
+        yield
+    finally:
+        tracer.close(opened)
+
+def count(key, amount=1):
+    """Add to a counter of the innermost open span, if tracing"""
+    if _tracer is not None:
+        _tracer.count(key, amount)
+
+def helper(fn):
+    """Count calls and cumulative time of a build helper while tracing"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            tracer.record_call(fn.__name__, time.perf_counter() - start)
+    return wrapper
@@ -2,6 +2,7 @@
 """
 TALIJA by Ranković - PowerPoint Presentation Generator
 Generates a bilingual (Serbian + Chinese) presentation for Chinese market
+from the deck spec in decks/talija.json, or any number of locale variants in one run
 """
 
 from pptx import Presentation
@@ -9,9 +10,29 @@ from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor as RgbColor
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
-from pptx.oxml.ns import nsmap
+from pptx.oxml.ns import nsdecls, nsmap, qn
 from pptx.oxml import parse_xml
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from concurrent.futures import ProcessPoolExecutor
+from deck_spec import DEFAULT_SPEC, Picture, Shape, SpecError, Text, load_deck
+from font_subset import eot_data, subset_font
+from image_cache import CACHE_PATH, file_hash, prepare_image, prepare_images
+from pptx_package import optimize_package, print_report, replace_slides, write_deterministic
+from shape_templates import clone_text_box
+from text_fit import fit_deck
+import argparse
+import asset_index
+import build_trace
+import hashlib
+import io
+import json
 import os
+import pptx
+import shutil
+import sys
 
 # Colors
 GOLD = RgbColor(201, 162, 39)
@@ -20,52 +41,84 @@ DARK_SOFT = RgbColor(30, 30, 30)
 BEIGE = RgbColor(245, 240, 230)
 WHITE = RgbColor(255, 255, 255)
 
+# Slide background themes and the layouts that carry them
+THEMES = {
+    "dark": DARK,
+    "light": BEIGE,
+    "gold": GOLD,
+}
+THEME_LAYOUT_NAMES = {
+    "dark": "TALIJA Dark",
+    "light": "TALIJA Light",
+    "gold": "TALIJA Gold",
+}
+
 # Base path for images
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 IMAGES_PATH = os.path.join(BASE_PATH, "images")
-
-def add_dark_background(slide):
-    """Add dark background to slide"""
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, Inches(13.333), Inches(7.5)
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = DARK
-    background.line.fill.background()
-    # Send to back
-    spTree = slide.shapes._spTree
-    sp = background._element
-    spTree.remove(sp)
-    spTree.insert(2, sp)
-
-def add_light_background(slide):
-    """Add light/beige background to slide"""
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, Inches(13.333), Inches(7.5)
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = BEIGE
-    background.line.fill.background()
-    spTree = slide.shapes._spTree
-    sp = background._element
-    spTree.remove(sp)
-    spTree.insert(2, sp)
-
-def add_gold_background(slide):
-    """Add gold background to slide"""
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, Inches(13.333), Inches(7.5)
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = GOLD
-    background.line.fill.background()
-    spTree = slide.shapes._spTree
-    sp = background._element
-    spTree.remove(sp)
-    spTree.insert(2, sp)
-
-def add_text_box(slide, left, top, width, height, text, font_size=18, bold=False, color=WHITE, align=PP_ALIGN.LEFT, font_name="Arial"):
-    """Add a text box to slide"""
+MANIFESTS_PATH = os.path.join(CACHE_PATH, "manifests")
+
+# Slide number text box (left, top, width, height in inches) and font size
+SLIDE_NUMBER_BOX = (11.5, 6.9, 1.5, 0.4)
+SLIDE_NUMBER_SIZE = 10
+
+# Hex digits of the content hash in content-addressed output names
+HASH_NAME_LENGTH = 12
+
+# Warnings already printed in this process
+_warned = set()
+
+# Embedded font part
+FONT_PART_NAME = "/ppt/fonts/font1.fntdata"
+FONT_CONTENT_TYPE = "application/x-fontdata"
+
+@build_trace.helper
+def add_theme_layouts(prs):
+    """Turn the default template into one background-filled blank layout per theme
+
+    Slides pick up their background from the layout instead of carrying a full-slide
+    rectangle. Every other layout is removed so it is not written to the saved package.
+    """
+    layouts = list(prs.slide_layouts)
+    # Reuse the Blank layout and two others; their placeholders are stripped below
+    reused = [layouts[6], layouts[5], layouts[1]]
+    for layout, (theme, color) in zip(reused, THEMES.items()):
+        layout_element = layout._element
+        layout_element.attrib.pop("type", None)  # custom layout
+        layout_element.cSld.set("name", THEME_LAYOUT_NAMES[theme])
+        spTree = layout.shapes._spTree
+        for sp in list(spTree)[2:]:
+            spTree.remove(sp)
+        layout.background.fill.solid()
+        layout.background.fill.fore_color.rgb = color
+    for layout in layouts:
+        if layout not in reused:
+            prs.slide_layouts.remove(layout)
+
+    # Printer settings and the blank-template thumbnail are not needed in generated decks
+    for rel_id, rel in list(prs.part.rels.items()):
+        if rel.reltype == RT.PRINTER_SETTINGS:
+            prs.part.drop_rel(rel_id)
+    package = prs.part.package
+    for rel_id, rel in list(package._rels.items()):
+        if rel.reltype == RT.THUMBNAIL:
+            package.drop_rel(rel_id)
+
+def theme_layouts(prs):
+    """Map theme name to the layout created for it by add_theme_layouts"""
+    by_name = {layout.name: layout for layout in prs.slide_layouts}
+    return {theme: by_name[name] for theme, name in THEME_LAYOUT_NAMES.items()}
+
+@build_trace.helper
+def add_text_box(slide, left, top, width, height, text, font_size=18, bold=False, color=WHITE, align=PP_ALIGN.LEFT, font_name="Arial", template=False, ea_font=""):
+    """Add a text box to slide, cloned from a cached XML template if template is set
+
+    ea_font names the typeface for East Asian characters; Latin text stays in font_name.
+    """
+    if template:
+        sp = clone_text_box(slide, Inches(left), Inches(top), Inches(width), Inches(height), text,
+                            font_size, bold, color, align, font_name, ea_font)
+        return slide.shapes._shape_factory(sp)
     txBox = slide.shapes.add_textbox(Inches(left), Inches(top), Inches(width), Inches(height))
     tf = txBox.text_frame
     tf.word_wrap = True
@@ -75,21 +128,32 @@ def add_text_box(slide, left, top, width, height, text, font_size=18, bold=False
     p.font.bold = bold
     p.font.color.rgb = color
     p.font.name = font_name
+    if ea_font:
+        ea = OxmlElement("a:ea")
+        ea.set("typeface", ea_font)
+        p.font._rPr.latin.addnext(ea)
     p.alignment = align
     return txBox
 
-def add_image_safe(slide, image_path, left, top, width=None, height=None):
-    """Add image to slide if it exists"""
-    full_path = os.path.join(BASE_PATH, image_path)
-    if os.path.exists(full_path):
-        if width and height:
-            return slide.shapes.add_picture(full_path, Inches(left), Inches(top), Inches(width), Inches(height))
-        elif width:
-            return slide.shapes.add_picture(full_path, Inches(left), Inches(top), width=Inches(width))
-        elif height:
-            return slide.shapes.add_picture(full_path, Inches(left), Inches(top), height=Inches(height))
-        else:
-            return slide.shapes.add_picture(full_path, Inches(left), Inches(top))
+@build_trace.helper
+def add_image_safe(slide, image_path, left, top, width=None, height=None, fit="stretch"):
+    """Add image to slide if it exists, downsampled to the size of its frame
+
+    With both width and height, fit "contain" shrinks the frame to the image's aspect
+    ratio and centres it, "cover" fills the frame and crops the overflow, and
+    "stretch" fills the frame regardless of aspect ratio. The frame comes from
+    picture_frame, which previews and the HTML presentation place pictures with too.
+    """
+    frame = picture_frame(Picture(box=(left, top, width, height), path=image_path, fit=fit))
+    if frame is not None:
+        info, (frame_left, frame_top, frame_width, frame_height), prepared = frame
+        build_trace.count("images")
+        build_trace.count("media_bytes", os.path.getsize(prepared))
+        picture = slide.shapes.add_picture(prepared, Inches(frame_left), Inches(frame_top),
+                                           Inches(frame_width), Inches(frame_height))
+        if fit == "cover" and width and height:
+            crop_to_cover(picture, info.oriented_size, width, height)
+        return picture
     else:
         # Add placeholder rectangle
         shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(left), Inches(top), Inches(width or 4), Inches(height or 3))
@@ -98,501 +162,510 @@ def add_image_safe(slide, image_path, left, top, width=None, height=None):
         shape.line.color.rgb = GOLD
         return shape
 
-def add_slide_number(slide, number, total=14, color=WHITE):
+def contain_box(size, left, top, width, height):
+    """Largest box with the aspect ratio of size inside the frame, centred in it"""
+    scale = min(width / size[0], height / size[1])
+    fitted_width = round(size[0] * scale, 4)
+    fitted_height = round(size[1] * scale, 4)
+    return left + (width - fitted_width) / 2, top + (height - fitted_height) / 2, fitted_width, fitted_height
+
+def picture_box(element):
+    """(full path, ImageInfo, (left, top, width, height)) of the frame a Picture's image is prepared for
+
+    Fit "contain" shrinks the frame to the image's aspect ratio; a missing width or
+    height stays None. Returns None if the image is missing.
+    """
+    full_path = os.path.join(BASE_PATH, element.path)
+    info = asset_index.lookup(full_path)
+    if info is None:
+        return None
+    left, top, width, height = element.box
+    if width and height and element.fit == "contain":
+        left, top, width, height = contain_box(info.oriented_size, left, top, width, height)
+    return full_path, info, (left, top, width, height)
+
+def picture_frame(element):
+    """(ImageInfo, (left, top, width, height), prepared image path) of a Picture as the deck places it
+
+    A missing width or height follows the image's aspect ratio, and a frame with
+    neither takes the image's size at 72 DPI. Returns None if the image is missing
+    or cannot be decoded, e.g. a file still being written; callers draw a placeholder.
+    """
+    placed = picture_box(element)
+    if placed is None:
+        return None
+    full_path, info, (left, top, width, height) = placed
+    try:
+        prepared = prepare_image(full_path, width, height)
+    except OSError as e:
+        message = f"Cannot decode {os.path.relpath(full_path, BASE_PATH)} ({e}), using a placeholder"
+        if message not in _warned:
+            _warned.add(message)
+            print(f"⚠️  {message}", file=sys.stderr)
+        return None
+    image_width, image_height = info.oriented_size
+    if width and not height:
+        height = width * image_height / image_width
+    elif height and not width:
+        width = height * image_width / image_height
+    elif not width:
+        width, height = image_width / 72, image_height / 72
+    return info, (left, top, width, height), prepared
+
+def crop_to_cover(picture, size, width, height):
+    """Crop picture evenly on two sides so the image keeps its aspect ratio in the frame"""
+    image_ratio = size[0] / size[1]
+    frame_ratio = width / height
+    if image_ratio > frame_ratio:
+        picture.crop_left = picture.crop_right = (1 - frame_ratio / image_ratio) / 2
+    elif image_ratio < frame_ratio:
+        picture.crop_top = picture.crop_bottom = (1 - image_ratio / frame_ratio) / 2
+
+@build_trace.helper
+def add_slide_number(slide, number, total=14, color=WHITE, template=False):
     """Add slide number to bottom right"""
-    add_text_box(slide, 11.5, 6.9, 1.5, 0.4, f"{number:02d} / {total}",
-                 font_size=10, color=color, align=PP_ALIGN.RIGHT)
-
-def create_presentation():
+    add_text_box(slide, *SLIDE_NUMBER_BOX, slide_number_text(number, total),
+                 font_size=SLIDE_NUMBER_SIZE, color=color, align=PP_ALIGN.RIGHT, template=template)
+
+def slide_number_text(number, total):
+    """Text of the slide number box, e.g. 03 / 14"""
+    return f"{number:02d} / {total}"
+
+@build_trace.helper
+def add_shape(slide, shape_type, left, top, width, height, fill, line=None):
+    """Add a filled shape with an outline in line color, or no outline"""
+    shape = slide.shapes.add_shape(shape_type, Inches(left), Inches(top), Inches(width), Inches(height))
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = fill
+    if line is None:
+        shape.line.fill.background()
+    else:
+        shape.line.color.rgb = line
+    return shape
+
+# Spec names to python-pptx values
+ALIGNMENTS = {
+    "left": PP_ALIGN.LEFT,
+    "center": PP_ALIGN.CENTER,
+    "right": PP_ALIGN.RIGHT,
+}
+SHAPE_TYPES = {
+    "rectangle": MSO_SHAPE.RECTANGLE,
+    "rounded_rectangle": MSO_SHAPE.ROUNDED_RECTANGLE,
+}
+
+def render_slide(slide, model, number, total, templates=True):
+    """Draw a compiled slide model onto a blank slide
+
+    With templates, text boxes are cloned from cached XML instead of being built
+    property by property through python-pptx. The background comes from the layout.
+    """
+    if templates:
+        # Hand out shape ids from a running counter instead of scanning the tree per shape
+        slide.shapes.turbo_add_enabled = True
+    for element in model.elements:
+        if isinstance(element, Text):
+            add_text_box(slide, *element.box, element.text, font_size=element.size, bold=element.bold,
+                         color=RgbColor(*element.color), align=ALIGNMENTS[element.align],
+                         font_name=element.font, template=templates, ea_font=element.ea_font)
+        elif isinstance(element, Picture):
+            add_image_safe(slide, element.path, *element.box, fit=element.fit)
+        elif isinstance(element, Shape):
+            add_shape(slide, SHAPE_TYPES[element.shape], *element.box, RgbColor(*element.fill),
+                      RgbColor(*element.line) if element.line else None)
+    add_slide_number(slide, number, total, color=RgbColor(*model.number_color), template=templates)
+
+def deck_text(deck):
+    """Every string the deck's text boxes show, slide numbers included"""
+    total = len(deck.slides)
+    for number, slide in enumerate(deck.slides, 1):
+        for element in slide.elements:
+            if isinstance(element, Text):
+                yield element.text
+        yield slide_number_text(number, total)
+
+def deck_font(deck, extra_text=""):
+    """Path of the subset of the deck's East Asian font covering its text and extra_text, or None"""
+    if deck.ea_font is None:
+        return None
+    return subset_font(os.path.join(BASE_PATH, deck.ea_font.path), "".join(deck_text(deck)) + extra_text)
+
+@build_trace.helper
+def embed_font(prs, typeface, font_path):
+    """Embed the TrueType font at font_path in prs as the regular style of typeface
+
+    The part holds the font as Embedded OpenType, the format PowerPoint writes to
+    .fntdata parts; saveSubsetFonts keeps PowerPoint from replacing it with the full
+    font when the deck is saved again.
+    """
+    blob = eot_data(font_path)
+    build_trace.count("font_bytes", len(blob))
+    part = Part(PackURI(FONT_PART_NAME), FONT_CONTENT_TYPE, prs.part.package, blob)
+    rel_id = prs.part.relate_to(part, RT.FONT)
+    presentation = prs.part._element
+    presentation.set("embedTrueTypeFonts", "1")
+    presentation.set("saveSubsetFonts", "1")
+    font_list = parse_xml(f'<p:embeddedFontLst {nsdecls("p", "r")}><p:embeddedFont><p:font/>'
+                          f'<p:regular r:id="{rel_id}"/></p:embeddedFont></p:embeddedFontLst>')
+    font_list[0][0].set("typeface", typeface)
+    presentation.find(qn("p:notesSz")).addnext(font_list)
+
+def new_presentation(deck):
+    """Create an empty presentation sized for deck, with one layout per background theme"""
     prs = Presentation()
-    prs.slide_width = Inches(13.333)  # 16:9 widescreen
-    prs.slide_height = Inches(7.5)
-
-    blank_layout = prs.slide_layouts[6]  # Blank layout
-
-    # ==================== SLIDE 1: Title ====================
-    slide1 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide1)
-
-    # Brand name
-    add_text_box(slide1, 0, 2, 13.333, 1, "TALIJA",
-                 font_size=72, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-    add_text_box(slide1, 0, 2.9, 13.333, 0.5, "by Ranković",
-                 font_size=24, color=WHITE, align=PP_ALIGN.CENTER)
-
-    # Gold line
-    line = slide1.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(5.9), Inches(3.5), Inches(1.5), Inches(0.02))
-    line.fill.solid()
-    line.fill.fore_color.rgb = GOLD
-    line.line.fill.background()
-
-    # Tagline
-    add_text_box(slide1, 0, 3.8, 13.333, 0.5, "Porodično Nasleđe",
-                 font_size=28, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text_box(slide1, 0, 4.3, 13.333, 0.5, "家族传承与当代表达的融合",
-                 font_size=22, color=WHITE, align=PP_ALIGN.CENTER)
-
-    # Subtitle
-    add_text_box(slide1, 0, 5, 13.333, 0.5, "Premium Srpska Rakija · 塞尔维亚优质拉基亚",
-                 font_size=18, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text_box(slide1, 0, 5.5, 13.333, 0.4, "Porodično nasleđe pretočeno u savremeni izraz",
-                 font_size=14, color=RgbColor(200, 200, 200), align=PP_ALIGN.CENTER)
-
-    # Footer
-    add_text_box(slide1, 0, 6.3, 13.333, 0.4, "Destilerija Ranković · Est. 2022 · Lazarevac, Srbija",
-                 font_size=12, color=RgbColor(150, 150, 150), align=PP_ALIGN.CENTER)
-
-    add_slide_number(slide1, 1)
-
-    # ==================== SLIDE 2: Serbia & Rakija ====================
-    slide2 = prs.slides.add_slide(blank_layout)
-    add_light_background(slide2)
-
-    # Title
-    add_text_box(slide2, 0, 0.5, 13.333, 0.7, "Srbija – Zemlja Rakije",
-                 font_size=36, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide2, 0, 1.1, 13.333, 0.5, "塞尔维亚 - 拉基亚之乡",
-                 font_size=24, color=DARK, align=PP_ALIGN.CENTER)
-
-    # Image
-    add_image_safe(slide2, "images/viber_slika_2025-12-08_16-15-36-688.jpg", 0.8, 2, 5.5, 4)
-
-    # Features list
-    features = [
-        ("🍇 Decenijska tradicija · 数十年的传统", "Porodična proizvodnja rakije kroz generacije"),
-        ("🏠 Porodična tradicija · 家族传统", "Svaka porodica ima svoju recepturu"),
-        ("🤝 Simbol gostoprimstva · 好客的象征", "Rakija se služi gostima kao znak dobrodošlice"),
-        ("🌍 Geografski zaštićen proizvod · 地理标志保护产品", "Autentičan evropski proizvod"),
-    ]
-
-    y_pos = 2.2
-    for title, desc in features:
-        add_text_box(slide2, 6.8, y_pos, 5.5, 0.4, title,
-                     font_size=14, bold=True, color=DARK)
-        add_text_box(slide2, 6.8, y_pos + 0.35, 5.5, 0.4, desc,
-                     font_size=11, color=RgbColor(80, 80, 80))
-        y_pos += 1.0
-
-    add_slide_number(slide2, 2, color=DARK)
-
-    # ==================== SLIDE 3: Destilerija Ranković ====================
-    slide3 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide3)
-
-    # Title
-    add_text_box(slide3, 0, 0.5, 13.333, 0.7, "Destilerija Ranković",
-                 font_size=36, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text_box(slide3, 0, 1.1, 13.333, 0.5, "兰科维奇酿酒厂",
-                 font_size=24, color=WHITE, align=PP_ALIGN.CENTER)
-
-    # Image
-    add_image_safe(slide3, "images/new/WhatsApp Image 2025-12-16 at 9.35.29 PM (1).jpeg", 0.8, 2, 5.5, 4)
-
-    # Content
-    add_text_box(slide3, 6.8, 2, 5.5, 0.6, "Znanje Koje Se Ne Prekida",
-                 font_size=20, bold=True, color=GOLD)
-    add_text_box(slide3, 6.8, 2.4, 5.5, 0.4, "不曾中断的技艺传承",
-                 font_size=14, color=WHITE)
-
-    add_text_box(slide3, 6.8, 3, 5.5, 1.4,
-                 "Znanje o pečenju rakije u porodici Ranković prenosi se kroz tri generacije. Prvi je ovaj zanat započeo deda. Danas rakiju proizvode otac i sin zajedno.",
-                 font_size=12, color=WHITE)
-    add_text_box(slide3, 6.8, 4.3, 5.5, 0.8,
-                 "兰科维奇家族的蒸馏技艺已传承三代，如今由父子共同酿造。",
-                 font_size=11, color=RgbColor(180, 180, 180))
-
-    # Stats
-    add_text_box(slide3, 6.8, 5.3, 1.7, 0.6, "3", font_size=32, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-    add_text_box(slide3, 6.8, 5.8, 1.7, 0.3, "Generacije · 代", font_size=9, color=WHITE, align=PP_ALIGN.CENTER)
-
-    add_text_box(slide3, 8.6, 5.3, 1.7, 0.6, "10", font_size=32, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-    add_text_box(slide3, 8.6, 5.8, 1.7, 0.3, "Zlatnih medalja · 金奖", font_size=9, color=WHITE, align=PP_ALIGN.CENTER)
-
-    add_text_box(slide3, 10.4, 5.3, 1.7, 0.6, "4", font_size=32, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-    add_text_box(slide3, 10.4, 5.8, 1.7, 0.3, "Vrste rakije · 品种", font_size=9, color=WHITE, align=PP_ALIGN.CENTER)
-
-    add_slide_number(slide3, 3)
-
-    # ==================== SLIDE 4: Philosophy ====================
-    slide4 = prs.slides.add_slide(blank_layout)
-    add_gold_background(slide4)
-
-    # Title
-    add_text_box(slide4, 0, 0.8, 13.333, 0.7, "Tradicija Vođena Znanjem",
-                 font_size=36, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide4, 0, 1.4, 13.333, 0.5, "以知识引导的传统",
-                 font_size=24, color=DARK, align=PP_ALIGN.CENTER)
-
-    # Quote
-    add_text_box(slide4, 1.5, 2.3, 10.333, 1.2,
-                 '"U porodici Ranković znanje o destilaciji ne smatra se ličnom veštinom, već obavezom prema precima i odgovornošću prema generacijama koje dolaze."',
-                 font_size=20, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide4, 1.5, 3.5, 10.333, 0.8,
-                 "在兰科维奇家族中，蒸馏技艺并非个人能力的体现，而是一种对祖辈的责任，以及对未来世代的承诺。",
-                 font_size=15, color=DARK, align=PP_ALIGN.CENTER)
-
-    # Gold line (dark on gold bg)
-    line = slide4.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(5.9), Inches(4.5), Inches(1.5), Inches(0.02))
-    line.fill.solid()
-    line.fill.fore_color.rgb = DARK
-    line.line.fill.background()
-
-    add_text_box(slide4, 1.5, 4.9, 10.333, 0.8,
-                 "Pravi kvalitet se stalno potvrđuje učenjem i usavršavanjem. Trajna vrednost gradi se postepeno, kroz dosledan rad.",
-                 font_size=16, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide4, 1.5, 5.7, 10.333, 0.5,
-                 "真正的品质需要通过持续学习与精进不断验证。真正的价值来自循序渐进的坚持。",
-                 font_size=12, color=DARK, align=PP_ALIGN.CENTER)
-
-    add_slide_number(slide4, 4, color=DARK)
-
-    # ==================== SLIDE 5: Four Pillars ====================
-    slide5 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide5)
-
-    # Title
-    add_text_box(slide5, 0, 0.5, 13.333, 0.7, "Četiri Stuba Kvaliteta",
-                 font_size=36, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text_box(slide5, 0, 1.1, 13.333, 0.5, "质量四大支柱",
-                 font_size=24, color=WHITE, align=PP_ALIGN.CENTER)
-
-    # Four pillars
-    pillars = [
-        ("🍎", "Čisto Voće", "纯净水果", "100% prirodno voće bez aditiva", "100%天然水果，无添加剂"),
-        ("🔥", "Dvostruka Destilacija", "双重蒸馏", "Tradicionalne metode", "传统工艺"),
-        ("❤️", "Sa Ljubavlju", "用心酿造", "Ručna proizvodnja, mala serija", "手工制作，小批量生产"),
-        ("🏆", "Premium Kvalitet", "优质品质", "Bez kompromisa", "绝不妥协"),
-    ]
-
-    x_pos = 0.8
-    for emoji, title_sr, title_cn, desc_sr, desc_cn in pillars:
-        # Card background
-        card = slide5.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(x_pos), Inches(2), Inches(2.8), Inches(4.2))
-        card.fill.solid()
-        card.fill.fore_color.rgb = DARK_SOFT
-        card.line.color.rgb = GOLD
-
-        add_text_box(slide5, x_pos, 2.3, 2.8, 0.6, emoji, font_size=40, align=PP_ALIGN.CENTER)
-        add_text_box(slide5, x_pos, 3, 2.8, 0.4, title_sr, font_size=16, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-        add_text_box(slide5, x_pos, 3.4, 2.8, 0.4, title_cn, font_size=12, color=WHITE, align=PP_ALIGN.CENTER)
-        add_text_box(slide5, x_pos + 0.1, 4, 2.6, 0.6, desc_sr, font_size=11, color=WHITE, align=PP_ALIGN.CENTER)
-        add_text_box(slide5, x_pos + 0.1, 4.5, 2.6, 0.5, desc_cn, font_size=10, color=RgbColor(180, 180, 180), align=PP_ALIGN.CENTER)
-
-        x_pos += 3.1
-
-    add_slide_number(slide5, 5)
-
-    # ==================== SLIDE 6: Collection Overview ====================
-    slide6 = prs.slides.add_slide(blank_layout)
-    add_light_background(slide6)
-
-    # Title
-    add_text_box(slide6, 0, 0.5, 13.333, 0.7, "TALIJA Kolekcija",
-                 font_size=36, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide6, 0, 1.1, 13.333, 0.5, "塔利亚系列",
-                 font_size=24, color=DARK, align=PP_ALIGN.CENTER)
-
-    add_text_box(slide6, 0, 1.8, 13.333, 0.5, "Četiri ukusa, jedna priča · 四种口味，一个故事",
-                 font_size=20, color=DARK, align=PP_ALIGN.CENTER)
-
-    # Four products
-    products = [
-        ("🟣", "Šljiva", "李子"),
-        ("🍏", "Jabuka", "苹果"),
-        ("🍐", "Kruška", "梨子"),
-        ("🟡", "Dunja", "榅桲"),
-    ]
-
-    x_pos = 0.8
-    for emoji, name_sr, name_cn in products:
-        card = slide6.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(x_pos), Inches(2.8), Inches(2.8), Inches(2.5))
-        card.fill.solid()
-        card.fill.fore_color.rgb = WHITE
-        card.line.color.rgb = RgbColor(220, 220, 220)
-
-        add_text_box(slide6, x_pos, 3.1, 2.8, 0.8, emoji, font_size=48, align=PP_ALIGN.CENTER)
-        add_text_box(slide6, x_pos, 4, 2.8, 0.4, name_sr, font_size=18, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-        add_text_box(slide6, x_pos, 4.4, 2.8, 0.3, name_cn, font_size=12, color=DARK, align=PP_ALIGN.CENTER)
-
-        x_pos += 3.1
-
-    add_text_box(slide6, 0, 5.8, 13.333, 0.4, "TALIJA je naša ljubavna pesma srpskom voću.",
-                 font_size=14, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide6, 0, 6.2, 13.333, 0.4, "塔利亚是我们对塞尔维亚水果的爱的颂歌。",
-                 font_size=12, color=RgbColor(100, 100, 100), align=PP_ALIGN.CENTER)
-
-    add_slide_number(slide6, 6, color=DARK)
-
-    # ==================== SLIDE 7: Šljiva ====================
-    slide7 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide7)
-
-    # Image
-    add_image_safe(slide7, "images/viber_slika_2025-12-08_16-15-33-501.jpg", 0.5, 0.8, 5.5, 5.8)
-
-    # Content
-    add_text_box(slide7, 6.5, 1, 6, 0.3, "Srce Destilerije · 酒坊的核心之作",
-                 font_size=10, color=GOLD)
-    add_text_box(slide7, 6.5, 1.5, 6, 0.6, "TALIJA Šljiva",
-                 font_size=32, bold=True, color=WHITE)
-    add_text_box(slide7, 6.5, 2.1, 6, 0.4, "塔利亚李子白兰地",
-                 font_size=18, color=WHITE)
-
-    add_text_box(slide7, 6.5, 2.7, 6, 0.5, "🏆 Zlatna medalja · Novosadski sajam 2025",
-                 font_size=14, color=GOLD)
-
-    add_text_box(slide7, 6.5, 3.4, 6, 1.4,
-                 "Centralni proizvod destilerije i najviši izraz znanja porodice Ranković. Talija nije rakija od jedne sorte – ona je pažljivo razvijen blend više destilata.",
-                 font_size=12, color=WHITE)
-    add_text_box(slide7, 6.5, 4.8, 6, 1,
-                 "酒坊的核心产品，代表了兰科维奇家族技艺与经验的最高水平。TALI娅并非单一品种白兰地，而是一款精心调配而成的复合酒。",
-                 font_size=11, color=RgbColor(180, 180, 180))
-
-    add_text_box(slide7, 6.5, 6, 6, 0.4, "Ravnoteža daje dubinu, stabilnost i vrednost · 平衡赋予深度与价值",
-                 font_size=10, color=RgbColor(120, 120, 120))
-
-    add_slide_number(slide7, 7)
-
-    # ==================== SLIDE 8: Jabuka ====================
-    slide8 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide8)
-
-    # Content (left side)
-    add_text_box(slide8, 0.8, 1, 6, 0.3, "TALIJA COLLECTION",
-                 font_size=10, color=GOLD)
-    add_text_box(slide8, 0.8, 1.5, 6, 0.6, "TALIJA Jabuka",
-                 font_size=32, bold=True, color=WHITE)
-    add_text_box(slide8, 0.8, 2.1, 6, 0.4, "塔利亚苹果白兰地",
-                 font_size=18, color=WHITE)
-
-    add_text_box(slide8, 0.8, 2.8, 6, 0.5, '"Jutarnja Svetlost" · "晨曦之光"',
-                 font_size=18, color=GOLD)
-
-    add_text_box(slide8, 0.8, 3.6, 5.5, 1.2,
-                 "Sveža, živahna aroma zelenih i crvenih jabuka sa citruznim akcentima. Ukus je balansiran – slatko-kiselkasto, sa blagom začinskom notom.",
-                 font_size=13, color=WHITE)
-    add_text_box(slide8, 0.8, 4.8, 5.5, 1,
-                 "新鲜活泼的青苹果和红苹果香气，带有柑橘的点缀。口感平衡——酸甜适中，带有淡淡的香料味。",
-                 font_size=11, color=RgbColor(180, 180, 180))
-
-    add_text_box(slide8, 0.8, 6, 5.5, 0.4, "Osvežavajuća i elegantna · 清爽优雅",
-                 font_size=10, color=RgbColor(120, 120, 120))
-
-    # Image (right side)
-    add_image_safe(slide8, "images/viber_slika_2025-12-08_16-15-33-284.jpg", 7.3, 0.8, 5.5, 5.8)
-
-    add_slide_number(slide8, 8)
-
-    # ==================== SLIDE 9: Kruška ====================
-    slide9 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide9)
-
-    # Image
-    add_image_safe(slide9, "images/viber_image_2025-12-16_21-44-44-133.jpg", 0.5, 0.8, 5.5, 5.8)
-
-    # Content
-    add_text_box(slide9, 6.5, 1, 6, 0.3, "TALIJA COLLECTION",
-                 font_size=10, color=GOLD)
-    add_text_box(slide9, 6.5, 1.5, 6, 0.6, "TALIJA Kruška",
-                 font_size=32, bold=True, color=WHITE)
-    add_text_box(slide9, 6.5, 2.1, 6, 0.4, "塔利亚梨子白兰地",
-                 font_size=18, color=WHITE)
-
-    add_text_box(slide9, 6.5, 2.8, 6, 0.5, '"Kristalna Elegancija" · "水晶般的优雅"',
-                 font_size=18, color=GOLD)
-
-    add_text_box(slide9, 6.5, 3.6, 6, 1.2,
-                 "Mirisna, cvetna aroma odabranih sorti krušaka koja otvara čula. Ukus je svilenkast, mekan, sa fino izbalansiranom slatkoćom i diskretnom kiselošću.",
-                 font_size=13, color=WHITE)
-    add_text_box(slide9, 6.5, 4.8, 6, 1,
-                 "威廉斯梨的芬芳花香，唤醒感官。口感如丝般柔滑，甜度平衡，带有微妙的酸度。",
-                 font_size=11, color=RgbColor(180, 180, 180))
-
-    add_text_box(slide9, 6.5, 6, 6, 0.4, "Pažljiv odabir sorti · 精选品种",
-                 font_size=10, color=RgbColor(120, 120, 120))
-
-    add_slide_number(slide9, 9)
-
-    # ==================== SLIDE 10: Dunja ====================
-    slide10 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide10)
-
-    # Content (left side)
-    add_text_box(slide10, 0.8, 1, 6, 0.3, "TALIJA COLLECTION",
-                 font_size=10, color=GOLD)
-    add_text_box(slide10, 0.8, 1.5, 6, 0.6, "TALIJA Dunja",
-                 font_size=32, bold=True, color=WHITE)
-    add_text_box(slide10, 0.8, 2.1, 6, 0.4, "塔利亚榅桲白兰地",
-                 font_size=18, color=WHITE)
-
-    add_text_box(slide10, 0.8, 2.8, 6, 0.5, '"Zlatna Pesma" · "金色之歌"',
-                 font_size=18, color=GOLD)
-
-    add_text_box(slide10, 0.8, 3.6, 5.5, 1.2,
-                 "Bogata, složena aroma dunje sa cvetnim notama kamilice i toplim mednim tonovima. Završnica je duga, zlatna, aromatična.",
-                 font_size=13, color=WHITE)
-    add_text_box(slide10, 0.8, 4.8, 5.5, 1,
-                 "榅桲的浓郁复杂香气，带有洋甘菊和烤杏的花香。余味悠长，金色，芳香四溢。",
-                 font_size=11, color=RgbColor(180, 180, 180))
-
-    add_text_box(slide10, 0.8, 6, 5.5, 0.4, "Retka i dragocena · 稀有珍贵",
-                 font_size=10, color=RgbColor(120, 120, 120))
-
-    # Image (right side)
-    add_image_safe(slide10, "images/viber_slika_2025-12-08_16-15-33-077.jpg", 7.3, 0.8, 5.5, 5.8)
-
-    add_slide_number(slide10, 10)
-
-    # ==================== SLIDE 11: Tihi Luksuz ====================
-    slide11 = prs.slides.add_slide(blank_layout)
-    add_gold_background(slide11)
-
-    # Title
-    add_text_box(slide11, 0, 0.5, 13.333, 0.7, "Tihi Luksuz",
-                 font_size=36, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide11, 0, 1.1, 13.333, 0.5, "低调而内敛的奢华",
-                 font_size=20, color=DARK, align=PP_ALIGN.CENTER)
-
-    # Quote
-    add_text_box(slide11, 1, 1.8, 11.333, 0.8,
-                 "Talija svoju vrednost ne gradi kroz upadljivu promociju, već kroz poreklo, proces i priznanja.",
-                 font_size=14, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide11, 1, 2.5, 11.333, 0.5,
-                 "TALI娅的价值并不依赖张扬的宣传，而体现在其来源、工艺与获得的认可之中。",
-                 font_size=11, color=RgbColor(60, 60, 60), align=PP_ALIGN.CENTER)
-
-    # Reasons - left column
-    reasons_left = [
-        ("🏆 10 zlatnih medalja · 十枚金奖", "Novosadski sajam 2025 · 诺维萨德农博会"),
-        ("🔒 Ograničena proizvodnja · 限量生产", "Potpuna kontrola kvaliteta · 全面品控"),
-        ("🎁 Premium poklon · 高端礼品", "Gravirane čašice · 定制雕刻酒杯"),
-    ]
-
-    y_pos = 3.2
-    for title, desc in reasons_left:
-        add_text_box(slide11, 0.8, y_pos, 5.5, 0.4, title, font_size=13, bold=True, color=DARK)
-        add_text_box(slide11, 0.8, y_pos + 0.35, 5.5, 0.4, desc, font_size=10, color=RgbColor(60, 60, 60))
-        y_pos += 1.0
-
-    # Reasons - right column
-    reasons_right = [
-        ("🌿 Prirodni proizvod · 天然产品", "100% voće, bez aditiva · 100%水果"),
-        ("🤝 Dugoročna partnerstva · 长期合作", "Stabilnost i poverenje · 稳定与信任"),
-        ("🌍 Autentičan proizvod · 正宗产品", "Iz srca Srbije · 来自塞尔维亚"),
-    ]
-
-    y_pos = 3.2
-    for title, desc in reasons_right:
-        add_text_box(slide11, 7, y_pos, 5.5, 0.4, title, font_size=13, bold=True, color=DARK)
-        add_text_box(slide11, 7, y_pos + 0.35, 5.5, 0.4, desc, font_size=10, color=RgbColor(60, 60, 60))
-        y_pos += 1.0
-
-    add_slide_number(slide11, 11, color=DARK)
-
-    # ==================== SLIDE 12: Cooperation ====================
-    slide12 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide12)
-
-    # Title
-    add_text_box(slide12, 0, 0.5, 13.333, 0.7, "Mogućnosti Saradnje",
-                 font_size=36, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text_box(slide12, 0, 1.1, 13.333, 0.5, "合作机会",
-                 font_size=24, color=WHITE, align=PP_ALIGN.CENTER)
-
-    # Cooperation options
-    options = [
-        ("🤝", "Ekskluzivna Distribucija", "独家经销", "Ekskluzivna prava za regione", "区域独家经销权"),
-        ("🏪", "Uvoz i Veleprodaja", "进口批发", "Direktan uvoz iz Srbije", "从塞尔维亚直接进口"),
-        ("🍽️", "HoReCa", "酒店餐饮", "Hoteli, restorani, barovi", "酒店、餐厅、酒吧"),
-        ("🎁", "Poklon Tržište", "礼品市场", "Premium pokloni i setovi", "高端礼品和套装"),
-    ]
-
-    x_pos = 0.8
-    for emoji, title_sr, title_cn, desc_sr, desc_cn in options:
-        card = slide12.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(x_pos), Inches(2), Inches(2.8), Inches(4))
-        card.fill.solid()
-        card.fill.fore_color.rgb = DARK_SOFT
-        card.line.color.rgb = GOLD
-
-        add_text_box(slide12, x_pos, 2.3, 2.8, 0.6, emoji, font_size=36, align=PP_ALIGN.CENTER)
-        add_text_box(slide12, x_pos, 3, 2.8, 0.4, title_sr, font_size=14, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-        add_text_box(slide12, x_pos, 3.4, 2.8, 0.4, title_cn, font_size=12, color=WHITE, align=PP_ALIGN.CENTER)
-        add_text_box(slide12, x_pos + 0.1, 4, 2.6, 0.5, desc_sr, font_size=10, color=WHITE, align=PP_ALIGN.CENTER)
-        add_text_box(slide12, x_pos + 0.1, 4.4, 2.6, 0.5, desc_cn, font_size=9, color=RgbColor(180, 180, 180), align=PP_ALIGN.CENTER)
-
-        x_pos += 3.1
-
-    add_slide_number(slide12, 12)
-
-    # ==================== SLIDE 13: Contact ====================
-    slide13 = prs.slides.add_slide(blank_layout)
-    add_light_background(slide13)
-
-    # Title
-    add_text_box(slide13, 0, 0.8, 13.333, 0.7, "Kontakt",
-                 font_size=36, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-    add_text_box(slide13, 0, 1.4, 13.333, 0.5, "联系方式",
-                 font_size=24, color=DARK, align=PP_ALIGN.CENTER)
-
-    # Contact info
-    contacts = [
-        ("📍", "Adresa · 地址", "Medoševački Put 2a\nLazarevac, Srbija"),
-        ("📞", "Telefon · 电话", "+381 65 383 00 10"),
-        ("✉️", "Email · 邮箱", "destilerijarankovic@gmail.com"),
-    ]
-
-    x_pos = 1.5
-    for emoji, title, info in contacts:
-        add_text_box(slide13, x_pos, 2.8, 3.5, 0.6, emoji, font_size=36, color=GOLD, align=PP_ALIGN.CENTER)
-        add_text_box(slide13, x_pos, 3.5, 3.5, 0.4, title, font_size=14, bold=True, color=DARK, align=PP_ALIGN.CENTER)
-        add_text_box(slide13, x_pos, 4, 3.5, 1, info, font_size=13, color=DARK, align=PP_ALIGN.CENTER)
-        x_pos += 3.8
-
-    # Website
-    add_text_box(slide13, 0, 5.5, 13.333, 0.5, "🌐 rakijatalija.rs",
-                 font_size=20, color=DARK, align=PP_ALIGN.CENTER)
-
-    add_slide_number(slide13, 13, color=DARK)
-
-    # ==================== SLIDE 14: Closing ====================
-    slide14 = prs.slides.add_slide(blank_layout)
-    add_dark_background(slide14)
-
-    # Brand
-    add_text_box(slide14, 0, 2, 13.333, 1, "TALIJA",
-                 font_size=72, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-
-    # Gold line
-    line = slide14.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(5.9), Inches(3.2), Inches(1.5), Inches(0.02))
-    line.fill.solid()
-    line.fill.fore_color.rgb = GOLD
-    line.line.fill.background()
-
-    # Quote
-    add_text_box(slide14, 1.5, 3.6, 10.333, 0.6,
-                 "Pozivamo vas da postanete deo naše priče.",
-                 font_size=22, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text_box(slide14, 1.5, 4.2, 10.333, 0.5,
-                 "欢迎您成为我们故事的一部分。",
-                 font_size=18, color=WHITE, align=PP_ALIGN.CENTER)
-
-    add_text_box(slide14, 1.5, 5, 10.333, 0.6,
-                 "Pravi uspeh gradi se kroz dugoročne odnose i međusobno poverenje.",
-                 font_size=12, color=RgbColor(180, 180, 180), align=PP_ALIGN.CENTER)
-    add_text_box(slide14, 1.5, 5.4, 10.333, 0.4,
-                 "真正的成功来自长期关系与相互信任。",
-                 font_size=10, color=RgbColor(140, 140, 140), align=PP_ALIGN.CENTER)
-
-    add_text_box(slide14, 0, 6.2, 13.333, 0.4, "Hvala · 谢谢",
-                 font_size=14, color=RgbColor(120, 120, 120), align=PP_ALIGN.CENTER)
-
-    add_slide_number(slide14, 14)
-
-    # Save presentation
-    output_path = os.path.join(BASE_PATH, "TALIJA_Presentation.pptx")
-    prs.save(output_path)
-    print(f"✅ Presentation saved to: {output_path}")
-    return output_path
+    prs.slide_width = Inches(deck.size[0])
+    prs.slide_height = Inches(deck.size[1])
+    add_theme_layouts(prs)
+    return prs
+
+def build_slides(prs, deck, indexes, templates=True):
+    """Render the slides of deck at indexes onto prs, in order"""
+    layouts = theme_layouts(prs)
+    for i in indexes:
+        with build_trace.span(f"slide {i + 1} {deck.slides[i].name}", "slide", peak=True):
+            slide = prs.slides.add_slide(layouts[deck.slides[i].background])
+            render_slide(slide, deck.slides[i], i + 1, len(deck.slides), templates)
+
+def skeleton_presentation(deck):
+    """Presentation with an empty slide on the right layout for every slide of deck"""
+    prs = new_presentation(deck)
+    layouts = theme_layouts(prs)
+    for model in deck.slides:
+        prs.slides.add_slide(layouts[model.background])
+    return prs
+
+def slide_packages(deck, indexes, jobs=2, templates=True):
+    """Build the slides of deck at indexes in up to jobs worker processes
+
+    Each worker renders a contiguous run of slides into a package of its own.
+    Returns [(package, {slide number in package: slide number in deck})] for
+    replace_slides, which assembles them into one deck. While tracing, the workers
+    trace their slides too and their spans and helper calls join the build's trace.
+    """
+    size = -(-len(indexes) // jobs)
+    chunks = [indexes[i:i + size] for i in range(0, len(indexes), size)]
+    tracer = build_trace.active()
+    trace_memory = tracer.memory if tracer else None
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        results = list(pool.map(_slide_package, [deck] * len(chunks), chunks, [templates] * len(chunks),
+                                [trace_memory] * len(chunks)))
+    for _, exported in results:
+        build_trace.merge(exported)
+    return [(io.BytesIO(data), {n + 1: i + 1 for n, i in enumerate(chunk)})
+            for (data, _), chunk in zip(results, chunks)]
+
+def _slide_package(deck, indexes, templates, trace_memory=None):
+    """(package bytes, exported trace) for the slides of deck at indexes (worker process entry point)
+
+    trace_memory is None when the parent is not tracing, else whether to trace allocations.
+    """
+    if trace_memory is not None:
+        build_trace.start(trace_memory)
+    try:
+        prs = new_presentation(deck)
+        build_slides(prs, deck, indexes, templates)
+        buffer = io.BytesIO()
+        prs.save(buffer)
+    finally:
+        tracer = build_trace.stop() if trace_memory is not None else None
+    return buffer.getvalue(), tracer.export() if tracer else None
+
+def slide_definition_hashes(deck):
+    """Content hash of each slide model, salted with the code that renders it"""
+    shared = hashlib.sha256()
+    for module in ("asset_index.py", "create_pptx.py", "deck_spec.py", "image_cache.py", "shape_templates.py"):
+        with open(os.path.join(BASE_PATH, module), "rb") as f:
+            shared.update(f.read())
+    shared.update(f"{pptx.__version__}|{deck.size}|{len(deck.slides)}".encode("utf-8"))
+    shared_hash = shared.hexdigest()
+    return [hashlib.sha256((shared_hash + slide.key).encode("utf-8")).hexdigest()
+            for slide in deck.slides]
+
+def image_hashes(image_paths):
+    """Map each image path to its content hash (None if the file is missing)"""
+    hashes = {}
+    for image_path in image_paths:
+        full_path = os.path.join(BASE_PATH, image_path)
+        hashes[image_path] = file_hash(full_path) if os.path.exists(full_path) else None
+    return hashes
+
+def manifest_path(output_path):
+    """Build manifest location for an output file"""
+    return os.path.join(MANIFESTS_PATH, os.path.basename(output_path) + ".json")
+
+def load_manifest(output_path):
+    """Return the manifest of the last build of output_path if it still matches the file"""
+    try:
+        with open(manifest_path(output_path), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("output") != output_path or not os.path.exists(output_path):
+        return None
+    if manifest.get("output_hash") != file_hash(output_path):
+        return None
+    return manifest
+
+def save_manifest(output_path, deck, definitions, font=None, optimized=False):
+    """Record the inputs and output hash of a finished build"""
+    manifest = {
+        "output": output_path,
+        "output_hash": file_hash(output_path),
+        "font": font,
+        "optimized": optimized,
+        "slides": [{"name": slide.name, "definition": definition, "images": image_hashes(slide.images)}
+                   for slide, definition in zip(deck.slides, definitions)],
+    }
+    os.makedirs(MANIFESTS_PATH, exist_ok=True)
+    with open(manifest_path(output_path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+def changed_slides(manifest, deck, definitions):
+    """Indexes of slides whose definition or images differ from the manifest"""
+    slides = manifest["slides"]
+    if len(slides) != len(definitions):
+        return list(range(len(definitions)))
+    return [i for i, (entry, definition) in enumerate(zip(slides, definitions))
+            if entry["definition"] != definition
+            or image_hashes(deck.slides[i].images) != entry["images"]]
+
+def image_frames(slides):
+    """Distinct (full path, width, height) frames the slides embed, in slide order"""
+    frames = {}
+    for slide in slides:
+        for element in slide.elements:
+            placed = picture_box(element) if isinstance(element, Picture) else None
+            if placed is not None:
+                full_path, _, (_, _, width, height) = placed
+                frames[(full_path, width, height)] = None
+    return list(frames)
+
+def prepare_slide_images(slides, jobs=1):
+    """Downsample every image the slides embed ahead of building them, across jobs processes"""
+    count = 0
+    with build_trace.span("prepare images"):
+        for _ in prepare_images(image_frames(slides), jobs):
+            count += 1
+    return count
+
+def load_fitted_deck(spec_path=DEFAULT_SPEC, locales=None, merge=None, skip=()):
+    """Load a deck with its text boxes autofitted, warning about text that still overflows"""
+    deck, overflows = fit_deck(load_deck(spec_path, locales, merge, skip))
+    for message in overflows:
+        print(f"⚠️  Text overflow on {message}", file=sys.stderr)
+    return deck
+
+def write_package(output_path, source):
+    """Write a saved package (path or stream) to output_path in deterministic form, atomically
+
+    Returns the sha256 hex digest of the written file.
+    """
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        digest = write_deterministic(source, f)
+    os.replace(tmp_path, output_path)
+    return digest
+
+def content_addressed_copy(output_path):
+    """Link (or copy) output_path to <stem>.<content hash>.pptx beside it and return that path"""
+    stem, ext = os.path.splitext(output_path)
+    hashed_path = f"{stem}.{file_hash(output_path)[:HASH_NAME_LENGTH]}{ext}"
+    if not os.path.exists(hashed_path):
+        try:
+            os.link(output_path, hashed_path)
+        except OSError:
+            shutil.copyfile(output_path, hashed_path)
+    print(f"✅ Content-addressed copy: {hashed_path}")
+    return hashed_path
+
+def write_presentation(stream, spec_path=DEFAULT_SPEC, locales=None, merge=None, skip=(), templates=True,
+                       font_text=""):
+    """Build a deck and write the .pptx package to a writable binary stream
+
+    The package is assembled in memory and written front to back with no temporary
+    file, so stream can be stdout, a socket or an HTTP response body. Equal inputs give
+    byte-identical packages. The embedded font also covers the characters of font_text,
+    for text substituted into the package later. Returns the deck.
+    """
+    deck = load_fitted_deck(spec_path, locales, merge, skip)
+    prs = new_presentation(deck)
+    build_slides(prs, deck, range(len(deck.slides)), templates)
+    font_path = deck_font(deck, font_text)
+    if font_path:
+        embed_font(prs, deck.ea_font.typeface, font_path)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    write_deterministic(buffer, stream)
+    asset_index.save_index()
+    return deck
+
+def presentation_bytes(spec_path=DEFAULT_SPEC, locales=None, merge=None, skip=(), templates=True):
+    """Build a deck and return the .pptx package as bytes"""
+    buffer = io.BytesIO()
+    write_presentation(buffer, spec_path, locales, merge, skip, templates)
+    return buffer.getvalue()
+
+def create_presentation(spec_path=DEFAULT_SPEC, output_path=None, incremental=True, templates=True, locales=None,
+                        jobs=1, content_hash=False, optimize=False, html=False):
+    """Build the deck into output_path, rebuilding only changed slides when incremental
+
+    The package is written deterministically: the same inputs give the same bytes
+    whether it was built in full or patched. With content_hash, the file is also
+    linked under its content hash and that path is returned. With optimize, the saved
+    package goes through the package optimiser, keeping every theme layout, before
+    the manifest is written. With
+    html, the spec's HTML presentation is rendered from the same deck next to output_path.
+    """
+    with build_trace.span("load deck"):
+        deck = load_fitted_deck(spec_path, locales)
+    output_path = output_path or os.path.join(BASE_PATH, deck.output)
+    with build_trace.span("subset font"):
+        font_path = deck_font(deck)
+        font = os.path.basename(font_path) if font_path else None
+    with build_trace.span("check manifest"):
+        definitions = slide_definition_hashes(deck)
+        manifest = load_manifest(output_path) if incremental else None
+        # The font part is only written by full builds, so a new glyph set rebuilds everything;
+        # so does switching the optimiser, since it rewrites every part of the package
+        if manifest and manifest.get("font") == font and manifest.get("optimized", False) == optimize:
+            dirty = changed_slides(manifest, deck, definitions)
+        else:
+            dirty = list(range(len(deck.slides)))
+
+    if not dirty:
+        print(f"✅ Presentation up to date: {output_path}")
+        if html:
+            write_deck_html(deck, output_path)
+        asset_index.save_index()
+        return content_addressed_copy(output_path) if content_hash else output_path
+
+    if jobs > 1:
+        prepare_slide_images([deck.slides[i] for i in dirty], jobs)
+    parallel = jobs > 1 and len(dirty) > 1
+    if parallel:
+        with build_trace.span("build slides in workers"):
+            sources = slide_packages(deck, dirty, jobs, templates)
+    else:
+        with build_trace.span("new presentation"):
+            prs = new_presentation(deck)
+        build_slides(prs, deck, dirty, templates)
+    if len(dirty) < len(deck.slides):
+        # Only the changed slides were built; patch their parts into the existing package
+        if not parallel:
+            with build_trace.span("save", peak=True):
+                buffer = io.BytesIO()
+                prs.save(buffer)
+            sources = [(buffer, {n + 1: i + 1 for n, i in enumerate(dirty)})]
+        with build_trace.span("patch package", peak=True):
+            try:
+                replace_slides(output_path, sources)
+            except ValueError as e:
+                print(f"⚠️  Cannot patch {output_path} ({e}); rebuilding in full", file=sys.stderr)
+                return create_presentation(spec_path, output_path, False, templates, locales, jobs,
+                                           content_hash, optimize, html)
+            write_package(output_path, output_path)
+        print(f"✅ Rebuilt slides {', '.join(str(i + 1) for i in dirty)} in: {output_path}")
+    else:
+        if parallel:
+            with build_trace.span("new presentation"):
+                prs = skeleton_presentation(deck)
+        if font_path:
+            embed_font(prs, deck.ea_font.typeface, font_path)
+        with build_trace.span("save", peak=True):
+            # Saved to disk first rather than to memory, so the whole package is never held at once
+            saved_path = output_path + ".saved.tmp"
+            prs.save(saved_path)
+            if parallel:
+                replace_slides(saved_path, sources)
+            write_package(output_path, saved_path)
+            os.remove(saved_path)
+        print(f"✅ Presentation saved to: {output_path}")
+
+    if optimize:
+        with build_trace.span("optimize package", peak=True):
+            # Theme layouts stay, so a later incremental build can base changed slides on any of them
+            report = optimize_package(output_path, keep_layouts=True)
+        print_report(report)
+    with build_trace.span("save manifest"):
+        save_manifest(output_path, deck, definitions, font, optimize)
+    if html:
+        write_deck_html(deck, output_path)
+    asset_index.save_index()
+    return content_addressed_copy(output_path) if content_hash else output_path
+
+def write_deck_html(deck, output_path):
+    """Render the deck's HTML presentation beside output_path, if its spec names one"""
+    # Imported here: slide_html builds on this module
+    import slide_html
+    if not deck.html:
+        return None
+    html_path = os.path.join(os.path.dirname(output_path), deck.html)
+    with build_trace.span("write html"):
+        changed = slide_html.write_html(deck, html_path)
+    print(f"✅ HTML presentation {'saved to' if changed else 'up to date'}: {html_path}")
+    return html_path
+
+def create_variants(spec_path=DEFAULT_SPEC, variants=(), jobs=1, incremental=True, templates=True, content_hash=False,
+                    optimize=False, html=False):
+    """Build one presentation per locale list in variants, sharing prepared images
+
+    Images are decoded and downsampled once, before any deck is built; with jobs > 1
+    both the image preparation and the decks are spread over worker processes.
+    """
+    decks = [load_deck(spec_path, locales) for locales in variants]
+    prepared = prepare_slide_images([slide for deck in decks for slide in deck.slides], jobs)
+    print(f"🖼️  Prepared {prepared} images for {len(decks)} variants")
+    args = [(spec_path, None, incremental, templates, locales, 1, content_hash, optimize, html)
+            for locales in variants]
+    if jobs > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(args))) as pool:
+            return list(pool.map(create_presentation, *zip(*args)))
+    return [create_presentation(*a) for a in args]
 
 if __name__ == "__main__":
-    create_presentation()
+    parser = argparse.ArgumentParser(description="Generate a TALIJA presentation from a deck spec")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON (default: decks/talija.json)")
+    parser.add_argument("-o", "--output",
+                        help="output .pptx path, or - for stdout (default: the spec's output next to this script)")
+    parser.add_argument("--full", action="store_true",
+                        help="rebuild every slide even if the build manifest says it is up to date")
+    parser.add_argument("--no-templates", action="store_true",
+                        help="build every shape through the python-pptx API instead of cloning XML templates")
+    parser.add_argument("-l", "--locales", nargs="+", metavar="LANGS",
+                        help="build one variant per locale list, e.g. sr+zh sr+en zh (default: the spec's locales)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes for slides, image preparation and locale variants (default: 1)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="prune unused parts, merge duplicate media and recompress the saved package")
+    parser.add_argument("--no-html", action="store_true",
+                        help="do not render the spec's HTML presentation alongside the deck")
+    parser.add_argument("--content-hash", action="store_true",
+                        help="also write the deck as <name>.<content hash>.pptx for caches and CDNs")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record per-slide and per-helper timings, allocations and media bytes to PATH")
+    parser.add_argument("--trace-format", choices=("json", "chrome"), default="json",
+                        help="trace file format: JSON summary or Chrome trace events (default: json)")
+    args = parser.parse_args()
+    if args.trace:
+        build_trace.start()
+    if args.locales and args.output and len(args.locales) > 1:
+        parser.error("--output needs a single --locales variant")
+    try:
+        if args.output == "-":
+            write_presentation(sys.stdout.buffer, args.spec, templates=not args.no_templates,
+                               locales=args.locales[0].split("+") if args.locales else None)
+        elif args.locales and len(args.locales) > 1:
+            create_variants(args.spec, [v.split("+") for v in args.locales], args.jobs,
+                            incremental=not args.full, templates=not args.no_templates,
+                            content_hash=args.content_hash, optimize=args.optimize, html=not args.no_html)
+        else:
+            create_presentation(args.spec, args.output, incremental=not args.full,
+                                templates=not args.no_templates,
+                                locales=args.locales[0].split("+") if args.locales else None, jobs=args.jobs,
+                                content_hash=args.content_hash, optimize=args.optimize, html=not args.no_html)
+    except SpecError as e:
+        sys.exit(f"❌ Invalid deck spec: {e}")
+    finally:
+        if args.trace:
+            build_trace.stop().write(args.trace, chrome=args.trace_format == "chrome")
+            print(f"📊 Build trace written to: {args.trace}", file=sys.stderr)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Deck generation service
+Small offline HTTP server that renders decks on request and keeps recent ones
+in a size-bounded LRU cache
+"""
+
+from collections import OrderedDict
+from create_pptx import presentation_bytes
+from deck_spec import DEFAULT_SPEC, LOCALES_FOLDER, SpecError, load_deck
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_BYTES = 256 * 1024 * 1024
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+class DeckCache:
+    """LRU cache of rendered decks bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached deck for key (marking it recently used), or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def peek(self, key):
+        """Cached deck for key without touching the LRU order or counters"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, data):
+        """Store a deck, evicting least recently used ones to stay under max_bytes"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                    "bytes": self.size, "max_bytes": self.max_bytes}
+
+class DeckService:
+    """Turns request parameters into normalised deck keys and rendered decks"""
+
+    def __init__(self, spec_path=DEFAULT_SPEC, cache=None):
+        self.spec_path = spec_path
+        self.cache = cache or DeckCache()
+        deck = load_deck(spec_path)
+        self.locales = deck.locales
+        self.fields = deck.fields
+        self.products = deck.products
+        # Locale codes a request may ask for: the bundles beside the spec, never paths
+        folder = os.path.join(os.path.dirname(os.path.abspath(spec_path)), LOCALES_FOLDER)
+        self.bundles = {name[:-len(".json")] for name in os.listdir(folder)
+                        if re.fullmatch(r"[a-z]{2,3}\.json", name)} if os.path.isdir(folder) else set()
+        # Renders share the on-disk image cache, so build one deck at a time
+        self._render_lock = threading.Lock()
+
+    def deck_key(self, params):
+        """Normalised (locales, merge values, products) key for query parameters
+
+        locale is a locale list such as sr+zh (default: the spec's), partner with
+        region and rep personalises the deck, products lists the product slides to
+        keep (default: all). Raises SpecError for invalid parameters.
+        """
+        locales = tuple(c for c in re.split(r"[+, ]", params.get("locale", "").lower()) if c) or self.locales
+        unknown = [c for c in locales if c not in self.bundles and c not in self.locales]
+        if unknown:
+            raise SpecError(f"unknown locales {', '.join(repr(c) for c in unknown)}; "
+                            f"available: {', '.join(sorted(self.bundles))}")
+        merge = None
+        if params.get("partner", "").strip():
+            values = {f: " ".join(params.get(f, "").split()) for f in self.fields}
+            missing = [f for f, v in values.items() if not v]
+            if missing:
+                raise SpecError(f"missing {', '.join(missing)} for a personalised deck")
+            merge = tuple(values.items())
+        products = self.products
+        if params.get("products", "").strip():
+            wanted = {p for p in re.split(r"[+, ]", params["products"].lower()) if p}
+            unknown = wanted - set(self.products)
+            if unknown:
+                raise SpecError(f"unknown products {', '.join(sorted(unknown))}")
+            products = tuple(p for p in self.products if p in wanted)
+        return locales, merge, products
+
+    def render(self, key):
+        """Deck bytes for a normalised key, from the cache when possible, as (data, hit)"""
+        data = self.cache.get(key)
+        if data is not None:
+            return data, True
+        locales, merge, products = key
+        skip = tuple(p for p in self.products if p not in products)
+        with self._render_lock:
+            # A concurrent request for the same deck may have rendered it meanwhile
+            data = self.cache.peek(key)
+            if data is None:
+                data = presentation_bytes(self.spec_path, list(locales), dict(merge) if merge else None, skip)
+                self.cache.put(key, data)
+        return data, False
+
+    def filename(self, key):
+        locales, merge, _ = key
+        name = "TALIJA_" + "-".join(locales)
+        if merge:
+            name += "_" + re.sub(r"\W+", "_", merge[0][1]).strip("_")
+        return name + ".pptx"
+
+class DeckRequestHandler(BaseHTTPRequestHandler):
+    """GET / form, /deck.pptx?locale=&partner=&region=&rep=&products= and /stats"""
+
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/":
+            self._send(200, "text/html; charset=utf-8", self._form().encode("utf-8"))
+        elif url.path == "/stats":
+            self._send(200, "application/json", json.dumps(self.service.cache.stats()).encode("utf-8"))
+        elif url.path == "/deck.pptx":
+            try:
+                key = self.service.deck_key(params)
+                data, hit = self.service.render(key)
+            except SpecError as e:
+                self._send(400, "text/plain; charset=utf-8", f"Invalid deck parameters: {e}\n".encode("utf-8"))
+                return
+            # Decks are deterministic, so equal bytes mean an equal deck wherever it was rendered
+            etag = f'"{hashlib.sha256(data).hexdigest()}"'
+            if etag in self.headers.get("If-None-Match", ""):
+                self._send(304, PPTX_TYPE, b"", {"ETag": etag})
+                return
+            filename = self.service.filename(key)
+            self._send(200, PPTX_TYPE, data, {
+                "ETag": etag,
+                "Content-Disposition": f"attachment; filename=\"{filename.encode('ascii', 'replace').decode()}\"; "
+                                       f"filename*=UTF-8''{quote(filename)}",
+                "X-Cache": "HIT" if hit else "MISS",
+            })
+        else:
+            self._send(404, "text/plain; charset=utf-8", b"Not found\n")
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _form(self):
+        service = self.service
+        products = "".join(f'<label><input type="checkbox" name="p" value="{p}" checked> {escape(p)}</label> '
+                           for p in service.products)
+        stats = service.cache.stats()
+        return f"""<!DOCTYPE html>
+<html lang="sr"><head><meta charset="utf-8"><title>TALIJA decks</title></head>
+<body style="font-family: Arial, sans-serif; max-width: 40em; margin: 2em auto">
+<h1>TALIJA prezentacija</h1>
+<form action="/deck.pptx" onsubmit="this.products.value = [...this.querySelectorAll('[name=p]:checked')].map(e => e.value).join(',')">
+<p><label>Jezici <input name="locale" value="{'+'.join(service.locales)}"></label></p>
+<p><label>Partner <input name="partner"></label></p>
+<p><label>Region <input name="region"></label></p>
+<p><label>Predstavnik <input name="rep"></label></p>
+<p>{products}<input type="hidden" name="products"></p>
+<p><button>Preuzmi .pptx</button></p>
+</form>
+<p><small>Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} decks</small></p>
+</body></html>
+"""
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+def serve(spec_path=DEFAULT_SPEC, host=HOST, port=PORT, cache_bytes=CACHE_BYTES):
+    """Serve decks until interrupted"""
+    handler = type("Handler", (DeckRequestHandler,), {"service": DeckService(spec_path, DeckCache(cache_bytes))})
+    with ThreadingHTTPServer((host, port), handler) as server:
+        print(f"✅ Serving TALIJA decks on http://{host}:{port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print(f"📊 Cache: {handler.service.cache.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve TALIJA decks over HTTP")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("--host", default=HOST, help=f"address to bind (default: {HOST})")
+    parser.add_argument("-p", "--port", type=int, default=PORT, help=f"port (default: {PORT})")
+    parser.add_argument("--cache-mb", type=int, default=CACHE_BYTES // (1024 * 1024),
+                        help="rendered deck cache size in MB (default: 256)")
+    args = parser.parse_args()
+    serve(args.spec, args.host, args.port, args.cache_mb * 1024 * 1024)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Deck specification
+Parses and validates a JSON deck spec into an immutable in-memory slide model,
+resolving translatable text from the locale bundles in decks/locales
+"""
+
+from dataclasses import asdict, dataclass, replace
+import hashlib
+import json
+import os
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DECKS_PATH = os.path.join(BASE_PATH, "decks")
+DEFAULT_SPEC = os.path.join(DECKS_PATH, "talija.json")
+LOCALES_FOLDER = "locales"
+
+BACKGROUNDS = ("dark", "light", "gold")
+SHAPES = ("rectangle", "rounded_rectangle")
+ALIGNS = ("left", "center", "right")
+FITS = ("stretch", "contain", "cover")
+# What the generator does with text that overflows its box
+AUTOFITS = ("off", "flag", "shrink", "grow")
+# Which of the deck's languages a translated text element shows
+LANGS = ("primary", "secondary", "both")
+LANG_SEPARATOR = " · "
+
+class SpecError(ValueError):
+    """Raised when a deck spec is malformed"""
+
+@dataclass(frozen=True)
+class Text:
+    box: tuple
+    text: str
+    size: int = 18
+    bold: bool = False
+    color: tuple = (255, 255, 255)
+    align: str = "left"
+    font: str = "Arial"
+    ea_font: str = ""
+
+@dataclass(frozen=True)
+class Picture:
+    box: tuple
+    path: str
+    fit: str = "stretch"
+
+@dataclass(frozen=True)
+class Shape:
+    box: tuple
+    shape: str
+    fill: tuple
+    line: tuple = None
+
+@dataclass(frozen=True)
+class Slide:
+    name: str
+    background: str
+    number_color: tuple
+    elements: tuple
+    key: str = ""
+
+    @property
+    def images(self):
+        """Image paths this slide embeds, in order"""
+        return [e.path for e in self.elements if isinstance(e, Picture)]
+
+@dataclass(frozen=True)
+class EmbeddedFont:
+    """Font for East Asian text, subset and embedded in the package"""
+    typeface: str
+    path: str
+
+@dataclass(frozen=True)
+class Deck:
+    name: str
+    title: str
+    output: str
+    size: tuple
+    slides: tuple
+    locales: tuple = ()
+    fields: tuple = ()
+    products: tuple = ()
+    ea_font: EmbeddedFont = None
+    autofit: str = "flag"
+    html: str = ""
+
+def read_spec(path=DEFAULT_SPEC):
+    """Parse a deck spec file without compiling it"""
+    with open(path, encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except ValueError as e:
+            raise SpecError(f"{path}: {e}") from e
+
+def load_locale(code, folder=os.path.join(DECKS_PATH, LOCALES_FOLDER)):
+    """Messages of the locale bundle decks/locales/<code>.json"""
+    path = os.path.join(folder, f"{code}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            bundle = json.load(f)
+    except OSError as e:
+        raise SpecError(f"locale {code!r}: cannot read {path} ({e.strerror})") from e
+    except ValueError as e:
+        raise SpecError(f"locale {code!r}: {path}: {e}") from e
+    messages = bundle.get("messages") if isinstance(bundle, dict) else None
+    _require(isinstance(messages, dict), f"locale {code!r}", "expected a \"messages\" object")
+    return messages
+
+def load_deck(path=DEFAULT_SPEC, locales=None, merge=None, skip=()):
+    """Parse and validate a deck spec file in the given languages (default: the spec's own)"""
+    spec = read_spec(path)
+    _require(isinstance(spec, dict), "deck", "expected an object")
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), LOCALES_FOLDER)
+    codes = spec.get("locales", []) if locales is None else locales
+    return compile_deck(spec, {code: load_locale(code, folder) for code in codes}, merge, skip)
+
+def compile_deck(spec, catalogs=None, merge=None, skip=()):
+    """Validate a parsed deck spec and build the slide model
+
+    catalogs maps locale codes to their messages, primary language first. A deck
+    compiled in other languages than the spec's default gets the locale codes
+    appended to its output and HTML names. merge maps each of the spec's mail-merge fields
+    to its value; without it, elements marked "merge" are left out. Slides named
+    in skip are left out and the remaining ones renumbered.
+    """
+    _require(isinstance(spec, dict), "deck", "expected an object")
+    catalogs = catalogs or {}
+    fields = spec.get("fields", [])
+    _require(isinstance(fields, list) and all(isinstance(f, str) for f in fields), "fields",
+             "expected a list of names")
+    if merge is not None:
+        missing = [f for f in fields if f not in merge]
+        _require(not missing, "merge", f"missing values for {', '.join(missing)}")
+    colors = {}
+    for name, value in spec.get("colors", {}).items():
+        colors[name] = _parse_color(value, {}, f"colors.{name}")
+    slides = spec.get("slides")
+    _require(isinstance(slides, list) and slides, "slides", "expected a non-empty list")
+    names = [s.get("name", f"slides[{i}]") if isinstance(s, dict) else None for i, s in enumerate(slides)]
+    products = spec.get("products", [])
+    _require(isinstance(products, list) and all(p in names for p in products), "products",
+             "expected a list of slide names")
+    unknown = [name for name in skip if name not in names]
+    _require(not unknown, "skip", f"unknown slides {', '.join(map(str, unknown))}")
+    output = spec.get("output", spec.get("name", "deck") + ".pptx")
+    html = spec.get("html", "")
+    _require(isinstance(html, str), "html", "expected a file name")
+    locales = tuple(catalogs)
+    if locales and list(locales) != spec.get("locales", []):
+        output = _suffixed(output, locales)
+        html = _suffixed(html, locales) if html else html
+    ea_font = _parse_font(spec["ea_font"], "ea_font") if "ea_font" in spec else None
+    autofit = spec.get("autofit", "flag")
+    _require(autofit in AUTOFITS, "autofit", f"expected one of {', '.join(AUTOFITS)}")
+    text_defaults = {"ea_font": ea_font.typeface if ea_font else ""}
+    return Deck(
+        name=spec.get("name", "deck"),
+        title=spec.get("title", ""),
+        output=output,
+        size=_parse_numbers(spec.get("size", [13.333, 7.5]), 2, "size"),
+        slides=tuple(_compile_slide(s, colors, catalogs, merge, text_defaults, f"slides[{i}]")
+                     for i, s in enumerate(slides) if names[i] not in skip),
+        locales=locales,
+        fields=tuple(fields),
+        products=tuple(products),
+        ea_font=ea_font,
+        autofit=autofit,
+        html=html,
+    )
+
+def slide_key(slide):
+    """Stable content hash of a compiled slide"""
+    data = asdict(slide)
+    data.pop("key")
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _compile_slide(spec, colors, catalogs, merge, defaults, where):
+    _require(isinstance(spec, dict), where, "expected an object")
+    background = spec.get("background", "dark")
+    _require(background in BACKGROUNDS, f"{where}.background", f"expected one of {', '.join(BACKGROUNDS)}")
+    elements = []
+    for i, element in enumerate(spec.get("elements", [])):
+        elements.extend(_compile_element(element, colors, catalogs, merge, defaults, f"{where}.elements[{i}]"))
+    slide = Slide(
+        name=spec.get("name", where),
+        background=background,
+        number_color=_parse_color(spec.get("number_color", "#FFFFFF"), colors, f"{where}.number_color"),
+        elements=tuple(elements),
+    )
+    return replace(slide, key=slide_key(slide))
+
+def _compile_element(spec, colors, catalogs, merge, defaults, where, origin=(0, 0), fields=None):
+    """Yield model elements for one spec element, expanding repeat groups"""
+    _require(isinstance(spec, dict), where, "expected an object")
+    kind = spec.get("type")
+    if kind == "repeat":
+        items = spec.get("items")
+        _require(isinstance(items, list), f"{where}.items", "expected a list")
+        start = _parse_numbers(spec.get("origin", [0, 0]), 2, f"{where}.origin")
+        step = _parse_numbers(spec.get("step", [0, 0]), 2, f"{where}.step")
+        for n, item in enumerate(items):
+            _require(isinstance(item, dict), f"{where}.items[{n}]", "expected an object")
+            item_origin = (origin[0] + start[0] + step[0] * n, origin[1] + start[1] + step[1] * n)
+            for i, child in enumerate(spec.get("elements", [])):
+                yield from _compile_element(child, colors, catalogs, merge, defaults,
+                                            f"{where}.items[{n}].elements[{i}]", item_origin, item)
+        return
+
+    box = _parse_box(spec.get("box"), origin, kind == "image", f"{where}.box")
+    if kind == "text":
+        if "msg" in spec:
+            text = _translate(spec, catalogs, fields, where)
+            if text is None:
+                return
+        else:
+            text = _fill(spec.get("text"), fields, f"{where}.text")
+        if spec.get("merge"):
+            if merge is None:
+                return
+            text = _fill(text, merge, f"{where}.text")
+        _require(_is_number(spec.get("size", 18)), f"{where}.size", "expected a number")
+        align = spec.get("align", "left")
+        _require(align in ALIGNS, f"{where}.align", f"expected one of {', '.join(ALIGNS)}")
+        yield Text(
+            box=box,
+            text=text,
+            size=spec.get("size", 18),
+            bold=bool(spec.get("bold", False)),
+            color=_parse_color(spec.get("color", "#FFFFFF"), colors, f"{where}.color"),
+            align=align,
+            font=spec.get("font", "Arial"),
+            ea_font=spec.get("ea_font", defaults["ea_font"]),
+        )
+    elif kind == "image":
+        path = spec.get("path")
+        _require(isinstance(path, str), f"{where}.path", "expected a string")
+        fit = spec.get("fit", "stretch")
+        _require(fit in FITS, f"{where}.fit", f"expected one of {', '.join(FITS)}")
+        yield Picture(box=box, path=path, fit=fit)
+    elif kind == "shape":
+        shape = spec.get("shape", "rectangle")
+        _require(shape in SHAPES, f"{where}.shape", f"expected one of {', '.join(SHAPES)}")
+        line = spec.get("line")
+        yield Shape(
+            box=box,
+            shape=shape,
+            fill=_parse_color(spec.get("fill"), colors, f"{where}.fill"),
+            line=_parse_color(line, colors, f"{where}.line") if line is not None else None,
+        )
+    else:
+        raise SpecError(f"{where}.type: unknown element type {kind!r}")
+
+def _translate(spec, catalogs, fields, where):
+    """Text of a msg element in the deck's languages, or None if it has nothing to show"""
+    lang = spec.get("lang", "primary")
+    _require(lang in LANGS, f"{where}.lang", f"expected one of {', '.join(LANGS)}")
+    _require(catalogs, f"{where}.msg", "no locales selected")
+    msg = _fill(spec["msg"], fields, f"{where}.msg")
+    codes = list(catalogs)
+    codes = {"primary": codes[:1], "secondary": codes[1:2], "both": codes[:2]}[lang]
+    if not codes:
+        # Single-language decks drop the secondary-language lines
+        return None
+    parts = []
+    for code in codes:
+        _require(msg in catalogs[code], f"{where}.msg", f"no {code} message {msg!r}")
+        parts.append(catalogs[code][msg])
+    return _fill(spec.get("prefix", ""), fields, f"{where}.prefix") + LANG_SEPARATOR.join(parts)
+
+def _fill(template, fields, where):
+    """Fill {name} placeholders of a repeat item template"""
+    _require(isinstance(template, str), where, "expected a string")
+    if fields is None:
+        return template
+    try:
+        return template.format_map(fields)
+    except (KeyError, ValueError) as e:
+        raise SpecError(f"{where}: cannot fill template ({e})") from e
+
+def _suffixed(filename, locales):
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}_{'-'.join(locales)}{ext}"
+
+def _parse_box(value, origin, allow_auto, where):
+    """[left, top, width, height] in inches, offset by origin; images may omit width/height"""
+    lengths = (2, 3, 4) if allow_auto else (4,)
+    _require(isinstance(value, list) and len(value) in lengths, where, "expected [left, top, width, height]")
+    values = list(value) + [None] * (4 - len(value))
+    for v in values[:2]:
+        _require(_is_number(v), where, "expected numbers")
+    for v in values[2:]:
+        _require(_is_number(v) or (allow_auto and v is None), where, "expected numbers")
+    left = round(origin[0] + values[0], 4)
+    top = round(origin[1] + values[1], 4)
+    return (left, top, values[2], values[3])
+
+def _parse_font(value, where):
+    """{"typeface": family name, "path": font file relative to the project} to an EmbeddedFont"""
+    _require(isinstance(value, dict) and isinstance(value.get("typeface"), str)
+             and isinstance(value.get("path"), str), where, "expected {\"typeface\": ..., \"path\": ...}")
+    return EmbeddedFont(value["typeface"], value["path"])
+
+def _parse_numbers(value, count, where):
+    _require(isinstance(value, list) and len(value) == count and all(_is_number(v) for v in value),
+             where, f"expected {count} numbers")
+    return tuple(value)
+
+def _parse_color(value, colors, where):
+    """Palette name or #RRGGBB to an (r, g, b) tuple"""
+    if isinstance(value, str) and value in colors:
+        return colors[value]
+    if isinstance(value, str) and value.startswith("#") and len(value) == 7:
+        try:
+            return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+        except ValueError:
+            pass
+    raise SpecError(f"{where}: unknown color {value!r}")
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _require(condition, where, message):
+    if not condition:
+        raise SpecError(f"{where}: {message}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Watch mode
+Polls the deck spec, locale bundles, fonts and images and rebuilds only the slides whose
+inputs changed, in one long-running process so every cache stays warm between builds
+"""
+
+from create_pptx import BASE_PATH, IMAGES_PATH, create_presentation
+from deck_spec import DEFAULT_SPEC, LOCALES_FOLDER, SpecError, read_spec
+import argparse
+import asset_index
+import os
+import sys
+import time
+
+# Seconds between polls, and how long a change must stay quiet before building
+POLL_INTERVAL = 0.2
+SETTLE_TIME = 0.3
+
+def watched_files(spec_path):
+    """Yield every input file of the deck: spec, locale bundles, font, images and code"""
+    yield spec_path
+    yield from _walk(os.path.join(os.path.dirname(os.path.abspath(spec_path)), LOCALES_FOLDER), (".json",))
+    try:
+        font = read_spec(spec_path).get("ea_font")
+    except SpecError:
+        font = None
+    if isinstance(font, dict) and isinstance(font.get("path"), str):
+        yield os.path.join(BASE_PATH, font["path"])
+    yield from _walk(IMAGES_PATH, asset_index.IMAGE_EXTENSIONS)
+    yield from _walk(BASE_PATH, (".py",), recursive=False)
+
+def snapshot(spec_path):
+    """{path: (mtime_ns, size)} of the deck's inputs that exist"""
+    state = {}
+    for path in watched_files(spec_path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+def changes(old, new):
+    """Paths added, removed or modified between two snapshots"""
+    return sorted(path for path in old.keys() | new.keys() if old.get(path) != new.get(path))
+
+def watch(spec_path=DEFAULT_SPEC, output_path=None, locales=None, templates=True, interval=POLL_INTERVAL):
+    """Build the deck, then rebuild the changed slides whenever an input changes, until interrupted
+
+    Code changes restart the process, since modules already imported cannot be reloaded safely.
+    """
+    state = snapshot(spec_path)
+    _build(spec_path, output_path, locales, templates)
+    print(f"👀 Watching {len(state)} files, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot(spec_path)
+            changed = changes(state, current)
+            if not changed:
+                continue
+            # Editors and image tools write in several steps; wait until the files are quiet
+            while True:
+                time.sleep(SETTLE_TIME)
+                settled = snapshot(spec_path)
+                if settled == current:
+                    break
+                changed = sorted(set(changed) | set(changes(current, settled)))
+                current = settled
+            state = current
+            names = ", ".join(os.path.relpath(path, BASE_PATH) for path in changed[:5])
+            more = f" and {len(changed) - 5} more" if len(changed) > 5 else ""
+            print(f"🔄 Changed: {names}{more}")
+            if any(path.endswith(".py") for path in changed):
+                print("🔁 Code changed, restarting")
+                sys.stdout.flush()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+            _build(spec_path, output_path, locales, templates)
+    except KeyboardInterrupt:
+        pass
+
+def _build(spec_path, output_path, locales, templates):
+    """One incremental build; a broken spec or failed build is reported and the watch goes on"""
+    start = time.perf_counter()
+    try:
+        create_presentation(spec_path, output_path, incremental=True, templates=templates, locales=locales,
+                            html=True)
+    except SpecError as e:
+        print(f"❌ Invalid deck spec: {e}")
+        return
+    except Exception as e:
+        # A half-written file or a bug must not end the watch; the next change builds again
+        print(f"❌ Build failed: {type(e).__name__}: {e}")
+        return
+    print(f"⏱️  {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def _walk(root, extensions, recursive=True):
+    """Yield paths of files below root with one of extensions"""
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                if recursive and not entry.name.startswith("."):
+                    stack.append(entry.path)
+            elif entry.name.lower().endswith(extensions):
+                yield entry.path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild a TALIJA deck whenever its spec, images or code change")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("-o", "--output", help="output .pptx path (default: the spec's output next to this script)")
+    parser.add_argument("-l", "--locales", metavar="LANGS", help="locale list, e.g. sr+en (default: the spec's locales)")
+    parser.add_argument("--no-templates", action="store_true",
+                        help="build every shape through the python-pptx API instead of cloning XML templates")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"seconds between polls (default: {POLL_INTERVAL})")
+    args = parser.parse_args()
+    watch(args.spec, args.output, args.locales.split("+") if args.locales else None,
+          not args.no_templates, args.interval)
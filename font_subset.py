@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Font subsetting
+Cuts an embeddable font down to the characters a deck actually uses, cached on disk
+by the hash of the font file and the character set (needs fontTools), and wraps it as
+Embedded OpenType for .pptx packages
+"""
+
+from image_cache import CACHE_PATH, file_hash
+import hashlib
+import logging
+import os
+import struct
+import sys
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont, TTLibError
+except ImportError:
+    subset = None
+
+FONT_CACHE_PATH = os.path.join(CACHE_PATH, "fonts")
+# Bump when the subsetter options change so old subsets are not reused
+SUBSET_VERSION = 1
+
+# Embedded OpenType header fields up to the names: version 2.1, no compression or XOR
+EOT_VERSION = 0x00020001
+EOT_MAGIC = 0x504C
+EOT_CHARSET = 1  # DEFAULT_CHARSET
+EOT_HEADER = struct.Struct("<IIII10sBBIHH4I2II4I")
+# Name records written into the header (family, style, version, full name), Windows English first
+EOT_NAME_IDS = (1, 2, 5, 4)
+WINDOWS_ENGLISH = (3, 1, 0x409)
+
+# Subset paths per key, shared by every deck built in the process
+_subsets = {}
+# Warnings already printed in this process
+_warned = set()
+
+def subset_key(font_path, text):
+    """Cache key of the subset of font_path covering the characters of text"""
+    characters = "".join(sorted(set(text)))
+    digest = hashlib.sha256(f"{SUBSET_VERSION}|{file_hash(font_path)}|".encode("utf-8"))
+    digest.update(characters.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+def subset_font(font_path, text):
+    """Path of a cached TrueType subset of font_path with the glyphs for text
+
+    Returns None, with a warning, if the font is missing, unreadable or fontTools
+    is not installed; the deck then names the font without embedding it.
+    """
+    if not os.path.exists(font_path):
+        _warn(f"Font not found, not embedded: {font_path}")
+        return None
+    key = subset_key(font_path, text)
+    if key in _subsets:
+        return _subsets[key]
+    cache_file = os.path.join(FONT_CACHE_PATH, key + ".ttf")
+    if not os.path.exists(cache_file):
+        if subset is None:
+            _warn("fontTools is not installed, fonts are not embedded (pip install fonttools)")
+            return None
+        try:
+            _subset(font_path, text, cache_file)
+        except (OSError, TTLibError) as e:
+            _warn(f"Cannot subset {font_path}: {e}")
+            return None
+    _subsets[key] = cache_file
+    return cache_file
+
+def _subset(font_path, text, cache_file):
+    options = subset.Options()
+    # Keep every name record so the family name matches the typeface the slides use
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.notdef_outline = True
+    # Tables the subsetter does not know (FFTM, vendor data) are dropped; that is expected
+    logging.getLogger("fontTools.subset").setLevel(logging.ERROR)
+    # Keep the source timestamp so the same text always gives the same subset
+    font = TTFont(font_path, fontNumber=0, lazy=True, recalcTimestamp=False)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes={ord(c) for c in text})
+    subsetter.subset(font)
+    os.makedirs(FONT_CACHE_PATH, exist_ok=True)
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    font.save(tmp_path)
+    font.close()
+    os.replace(tmp_path, cache_file)
+
+def eot_data(font_path):
+    """The TrueType font at font_path as uncompressed Embedded OpenType bytes
+
+    PowerPoint stores embedded fonts in .fntdata parts in this format, and LibreOffice
+    reads those parts as EOT only; a bare TrueType file there is ignored by both.
+    """
+    with open(font_path, "rb") as f:
+        font = f.read()
+    tables = _tables(font)
+    os2 = tables[b"OS/2"]
+    os2_version, weight, fs_type = struct.unpack_from(">H2xH2xH", font, os2)
+    panose = font[os2 + 32:os2 + 42]
+    unicode_ranges = struct.unpack_from(">4I", font, os2 + 42)
+    fs_selection, = struct.unpack_from(">H", font, os2 + 62)
+    code_pages = struct.unpack_from(">2I", font, os2 + 78) if os2_version >= 1 else (0, 0)
+    checksum_adjustment, = struct.unpack_from(">I", font, tables[b"head"] + 8)
+    names = _names(font, tables[b"name"])
+    name_fields = b""
+    for name_id in EOT_NAME_IDS:
+        encoded = names.get(name_id, "").encode("utf-16-le")
+        name_fields += struct.pack("<HH", 0, len(encoded)) + encoded
+    # Padding5 and an empty RootString: the font is not tied to a site
+    name_fields += struct.pack("<HH", 0, 0)
+    size = EOT_HEADER.size + len(name_fields) + len(font)
+    header = EOT_HEADER.pack(size, len(font), EOT_VERSION, 0, panose, EOT_CHARSET, fs_selection & 1, weight,
+                             fs_type, EOT_MAGIC, *unicode_ranges, *code_pages, checksum_adjustment, 0, 0, 0, 0)
+    return header + name_fields + font
+
+def _tables(font):
+    """{tag: offset} of the tables of a TrueType font"""
+    count, = struct.unpack_from(">H", font, 4)
+    return {tag: offset for tag, _, offset, _ in (struct.unpack_from(">4sIII", font, 12 + 16 * i)
+                                                  for i in range(count))}
+
+def _names(font, offset):
+    """{name id: text} from the name table, preferring Windows English records"""
+    count, strings = struct.unpack_from(">2xHH", font, offset)
+    names = {}
+    for i in range(count):
+        platform, encoding, language, name_id, length, start = struct.unpack_from(">6H", font, offset + 6 + 12 * i)
+        if platform != 3 or name_id not in EOT_NAME_IDS:
+            continue
+        if name_id not in names or (platform, encoding, language) == WINDOWS_ENGLISH:
+            data = font[offset + strings + start:offset + strings + start + length]
+            names[name_id] = data.decode("utf-16-be", "replace")
+    return names
+
+def _warn(message):
+    if message not in _warned:
+        _warned.add(message)
+        print(f"⚠️  {message}", file=sys.stderr)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Image preparation
+Downsamples photos to the pixel size their frame needs and caches the result on disk,
+optionally across a pool of worker processes
+"""
+
+from PIL import Image, ImageOps
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import asset_index
+import hashlib
+import os
+
+# Output settings
+IMAGE_DPI = 150
+IMAGE_QUALITY = 80
+
+# Cache location
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_PATH, ".cache")
+IMAGE_CACHE_PATH = os.path.join(CACHE_PATH, "images")
+
+# Source hashes memoised per (path, mtime, size) for the lifetime of the process
+_hash_memo = {}
+# Prepared copies per (source hash, frame, dpi, quality), shared by every deck built in the process
+_prepared = {}
+
+def file_hash(path):
+    """Return sha256 hex digest of a file's content"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _hash_memo[key] = digest.hexdigest()
+    return _hash_memo[key]
+
+def target_size(size, width=None, height=None, dpi=IMAGE_DPI):
+    """Pixel size that covers a width x height inch frame at dpi, keeping aspect ratio"""
+    src_w, src_h = size
+    scales = []
+    if width:
+        scales.append(width * dpi / src_w)
+    if height:
+        scales.append(height * dpi / src_h)
+    # Never upscale; without a frame the picture is only recompressed
+    scale = min(max(scales), 1.0) if scales else 1.0
+    return max(1, round(src_w * scale)), max(1, round(src_h * scale))
+
+def prepare_image(full_path, width=None, height=None, dpi=IMAGE_DPI, quality=IMAGE_QUALITY):
+    """Return path of a cached copy of full_path resized for its frame and re-encoded"""
+    path = cached_image(full_path, width, height, dpi, quality)
+    if path is None:
+        source_hash = file_hash(full_path)
+        path = _prepare(full_path, source_hash, width, height, dpi, quality)
+        _prepared[(source_hash, width, height, dpi, quality)] = path
+    return path
+
+def cached_image(full_path, width=None, height=None, dpi=IMAGE_DPI, quality=IMAGE_QUALITY):
+    """Path of the prepared copy of full_path if it is already cached, else None"""
+    source_hash = file_hash(full_path)
+    key = (source_hash, width, height, dpi, quality)
+    if key in _prepared and os.path.exists(_prepared[key]):
+        return _prepared[key]
+    # Header-only probe, so a cache hit never opens the image with Pillow
+    info = asset_index.lookup(full_path)
+    if info is not None:
+        cache_file = _cache_file(source_hash, target_size(info.oriented_size, width, height, dpi),
+                                 quality, info.alpha)
+        if os.path.exists(cache_file):
+            _prepared[key] = cache_file
+            return cache_file
+    return None
+
+def prepare_images(frames, jobs=None, dpi=IMAGE_DPI, quality=IMAGE_QUALITY):
+    """Prepare (full_path, width, height) frames, yielding (frame, path) in input order
+
+    Cache misses are decoded and re-encoded in up to jobs worker processes (default:
+    one per CPU). No more than jobs images are submitted ahead of the next one to
+    be yielded, so at most jobs full-resolution images are in memory at once.
+    Images that cannot be decoded yield a path of None.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    pool = None
+    pending = deque()
+    try:
+        for frame in frames:
+            path = cached_image(*frame, dpi=dpi, quality=quality)
+            if path is None and jobs > 1:
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=jobs)
+                # Hand out the oldest results before putting another image in flight
+                while sum(isinstance(p, Future) for _, p in pending) >= jobs:
+                    yield _finish(pending.popleft(), dpi, quality)
+                path = pool.submit(prepare_image, *frame, dpi, quality)
+            elif path is None:
+                try:
+                    path = prepare_image(*frame, dpi, quality)
+                except OSError:
+                    path = None
+            pending.append((frame, path))
+            while pending and (not isinstance(pending[0][1], Future) or pending[0][1].done()):
+                yield _finish(pending.popleft(), dpi, quality)
+        while pending:
+            yield _finish(pending.popleft(), dpi, quality)
+        asset_index.save_index()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+def _finish(item, dpi, quality):
+    """(frame, path) for a pending item, remembering paths prepared by a worker"""
+    frame, path = item
+    if isinstance(path, Future):
+        try:
+            path = path.result()
+        except OSError:
+            return frame, None
+        full_path, width, height = frame
+        _prepared[(file_hash(full_path), width, height, dpi, quality)] = path
+    return frame, path
+
+def _prepare(full_path, source_hash, width, height, dpi, quality):
+    """Write the disk cache entry for one source image and frame"""
+    with Image.open(full_path) as img:
+        size = target_size(oriented_size(img), width, height, dpi)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        cache_file = _cache_file(source_hash, size, quality, has_alpha)
+        if os.path.exists(cache_file):
+            return cache_file
+
+        img = ImageOps.exif_transpose(img)
+        if img.size != size:
+            img = img.resize(size, Image.LANCZOS)
+        os.makedirs(IMAGE_CACHE_PATH, exist_ok=True)
+        # Write to a temp name first so an interrupted build never leaves a truncated cache entry
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        if has_alpha:
+            img.convert("RGBA").save(tmp_file, "PNG", optimize=True)
+        else:
+            img.convert("RGB").save(tmp_file, "JPEG", quality=quality, optimize=True, progressive=True)
+        os.replace(tmp_file, cache_file)
+    return cache_file
+
+def _cache_file(source_hash, size, quality, has_alpha):
+    ext = ".png" if has_alpha else ".jpg"
+    return os.path.join(IMAGE_CACHE_PATH, f"{source_hash[:16]}-{size[0]}x{size[1]}-q{quality}{ext}")
+
+def oriented_size(img):
+    """Image size after applying its EXIF orientation"""
+    # Orientations 5-8 are rotated by 90 degrees and swap width and height
+    if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+        return img.size[1], img.size[0]
+    return img.size
@@ -147,7 +147,8 @@ document.addEventListener('DOMContentLoaded', function()
         item.addEventListener('click', function()
         {
             const img = this.querySelector('img');
-            lightboxImage.src = img.src;
+            // Responsive images carry a full-size copy for the lightbox
+            lightboxImage.src = img.dataset.full || img.src;
             lightboxImage.alt = img.alt;
             lightbox.classList.add('active');
             document.body.style.overflow = 'hidden';
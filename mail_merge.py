@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Partner mail merge
+Builds the deck once with marker text in its merge fields, then writes one copy per
+CSV row by substituting the markers in the affected slide parts only
+"""
+
+from create_pptx import BASE_PATH, write_presentation
+from dataclasses import replace
+from deck_spec import DEFAULT_SPEC, SpecError, Text, load_deck
+from pptx_package import deflate_entry, raw_entries, write_zip
+from text_fit import fit_text, line_capacity, line_count
+from xml.sax.saxutils import escape
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+
+MERGE_PATH = os.path.join(BASE_PATH, "merged")
+
+# Private-use characters survive python-pptx and XML escaping unchanged
+MARKER = "\ue000{}\ue001"
+
+def marker(field):
+    """Marker text standing in for field in the base package"""
+    return MARKER.format(field)
+
+def merge_overflows(deck, values):
+    """Overflow messages for the deck's merge text boxes filled with values ({field: text})
+
+    The base deck was fitted with marker text, so each row's values are checked
+    against the fitted boxes on their own.
+    """
+    messages = []
+    for number, slide in enumerate(deck.slides, 1):
+        for element in slide.elements:
+            if not isinstance(element, Text) or not any(marker(f) in element.text for f in deck.fields):
+                continue
+            text = element.text
+            for field in deck.fields:
+                text = text.replace(marker(field), _clean(values.get(field)))
+            _, overflows = fit_text(replace(element, text=text), "flag")
+            if overflows:
+                lines = line_count(text, element.size, element.box[2], element.font, element.bold)
+                messages.append(f"slide {number} {slide.name}: {text[:40]!r} wraps to {lines} "
+                                f"lines, box fits {line_capacity(element.size, element.box[3])}")
+    return messages
+
+def build_base(spec_path=DEFAULT_SPEC, locales=None, characters=""):
+    """Build the deck with every merge field set to its marker, as (deck, package bytes)
+
+    The embedded font subset covers characters as well, for the merge values that
+    replace the markers after the font is cut.
+    """
+    probe = load_deck(spec_path, locales)
+    buffer = io.BytesIO()
+    deck = write_presentation(buffer, spec_path, locales, merge={f: marker(f) for f in probe.fields},
+                              font_text="".join(sorted(set(characters))))
+    return deck, buffer.getvalue()
+
+class MergeTemplate:
+    """A built base package split into unchanged entries and parts with merge markers"""
+
+    def __init__(self, package, fields):
+        self.fields = fields
+        self.entries = raw_entries(io.BytesIO(package))
+        self.parts = {}
+        markers = [marker(f).encode("utf-8") for f in fields]
+        with zipfile.ZipFile(io.BytesIO(package)) as zf:
+            for index, (info, _) in enumerate(self.entries):
+                if info.filename.startswith("ppt/slides/slide"):
+                    xml = zf.read(info)
+                    if any(m in xml for m in markers):
+                        self.parts[index] = xml
+
+    def write(self, stream, values):
+        """Write the package personalised with values ({field: text}) to stream"""
+        replacements = [(marker(f).encode("utf-8"), _xml_text(values.get(f, ""))) for f in self.fields]
+        entries = list(self.entries)
+        for index, xml in self.parts.items():
+            for old, new in replacements:
+                xml = xml.replace(old, new)
+            entries[index] = deflate_entry(entries[index][0], xml)
+        write_zip(stream, entries)
+
+def merge_partners(csv_path, spec_path=DEFAULT_SPEC, output_dir=MERGE_PATH, locales=None):
+    """Write one personalised deck per row of csv_path into output_dir, returns the count
+
+    The CSV is read twice, a row at a time: once for the characters the embedded font
+    must cover, then to write the decks, so memory does not grow with the row count.
+    """
+    fields = load_deck(spec_path, locales).fields
+    characters = set()
+    for row in read_rows(csv_path, fields):
+        for field in fields:
+            characters.update(_clean(row.get(field)))
+    deck, package = build_base(spec_path, locales, characters)
+    template = MergeTemplate(package, deck.fields)
+    stem = os.path.splitext(deck.output)[0]
+    os.makedirs(output_dir, exist_ok=True)
+    used = set()
+    count = 0
+    overflowing = 0
+    for row in read_rows(csv_path, fields):
+        name = _unique(f"{stem}_{_slug(_clean(row.get(deck.fields[0]))) or 'partner'}", used)
+        messages = merge_overflows(deck, row)
+        for message in messages:
+            print(f"⚠️  Text overflow in {name} on {message}", file=sys.stderr)
+        overflowing += bool(messages)
+        with open(os.path.join(output_dir, name + ".pptx"), "wb") as out:
+            template.write(out, row)
+        count += 1
+    if overflowing:
+        print(f"⚠️  {overflowing} of {count} partner decks have text overflowing its box", file=sys.stderr)
+    print(f"✅ Merged {count} partner decks into: {output_dir}")
+    return count
+
+def read_rows(csv_path, fields):
+    """Yield the rows of csv_path one at a time, after checking it has a column per field"""
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [field for field in fields if field not in (reader.fieldnames or [])]
+        if missing:
+            raise SpecError(f"{csv_path}: missing columns {', '.join(missing)}")
+        yield from reader
+
+def _clean(value):
+    """A CSV value as it appears on the slide; line breaks and control characters become spaces"""
+    return re.sub(r"[\x00-\x1f]+", " ", value or "").strip()
+
+def _xml_text(value):
+    """Escape a CSV value for an <a:t> element"""
+    return escape(_clean(value)).encode("utf-8")
+
+def _slug(value):
+    return re.sub(r"\W+", "_", value).strip("_")
+
+def _unique(name, used):
+    """name, or name with a counter if it was handed out before"""
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{name}_{n}"
+    used.add(candidate)
+    return candidate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write one personalised TALIJA deck per CSV row")
+    parser.add_argument("csv", help="partners CSV with a column per merge field (partner, region, rep)")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("-o", "--output-dir", default=MERGE_PATH, help="folder for the merged decks (default: merged/)")
+    parser.add_argument("-l", "--locales", metavar="LANGS", help="locale list, e.g. sr+en (default: the spec's locales)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        merge_partners(args.csv, args.spec, args.output_dir, args.locales.split("+") if args.locales else None)
+    except SpecError as e:
+        sys.exit(f"❌ Invalid deck spec: {e}")
+    print(f"⏱️  {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - .pptx package helpers
+Works on the zip parts of a saved presentation without going through python-pptx
+"""
+
+from lxml import etree
+import argparse
+import hashlib
+import os
+import posixpath
+import re
+import struct
+import sys
+import zipfile
+import zlib
+
+CONTENT_TYPES = "[Content_Types].xml"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+LAYOUT_REL = R_NS + "/slideLayout"
+# Relationships a part uses only through r:id attributes in its XML; others (layout,
+# theme, master) are implied by their type and must stay even when nothing names them
+EXPLICIT_RELS = (R_NS + "/image", R_NS + "/hyperlink", R_NS + "/media", R_NS + "/audio", R_NS + "/video")
+# Formats that are already compressed and gain nothing from deflate
+STORED_EXTENSIONS = ("jpg", "jpeg", "png", "gif", "mp3", "mp4", "m4a", "m4v")
+
+# Content types for media extensions the generator can embed
+MEDIA_CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+}
+
+# Zip record layouts (signature first); only what a .pptx needs, no zip64
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+LOCAL_SIGNATURE = 0x04034B50
+CENTRAL_SIGNATURE = 0x02014B50
+END_SIGNATURE = 0x06054B50
+UTF8_FLAG = 0x0800
+ZIP_LIMIT = 0xFFFFFFFF
+
+# Timestamp and permissions of every entry of a deterministic package (zip dates start in 1980)
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_ATTRIBUTES = 0o644 << 16
+# Content types every package declares whether or not a part uses them
+BASE_EXTENSIONS = ("rels", "xml")
+
+def slide_part(number):
+    """Part name of slide number (1-based)"""
+    return f"ppt/slides/slide{number}.xml"
+
+def rels_part(part_name):
+    """Part name of the relationships part belonging to part_name"""
+    folder, name = posixpath.split(part_name)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+def rel_targets(rels_name, rels_xml):
+    """Yield absolute part names referenced by a .rels part"""
+    source_dir = posixpath.dirname(posixpath.dirname(rels_name))
+    for rel in etree.fromstring(rels_xml):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target")
+        if target.startswith("/"):
+            yield target[1:]
+        else:
+            yield posixpath.normpath(posixpath.join(source_dir, target))
+
+def replace_slides(target_path, sources):
+    """Copy slides from source packages over slides of the package at target_path
+
+    sources is a list of (source, mapping) with mapping {source slide number: target
+    slide number}. Media of the copied slides is added (reusing identical existing
+    parts) and media no longer referenced by any part is dropped. The target is
+    rewritten atomically, once for all sources. Raises ValueError if a copied slide
+    relates to a layout or other part the target does not have.
+    """
+    with zipfile.ZipFile(target_path) as dst:
+        names = dst.namelist()
+        existing_media = {}
+        for name in names:
+            if name.startswith("ppt/media/"):
+                existing_media[hashlib.sha256(dst.read(name)).hexdigest()] = name
+        taken = set(names)
+
+        replaced = {}
+        added = {}
+        for source, mapping in sources:
+            with zipfile.ZipFile(source) as src:
+                for src_number, dst_number in mapping.items():
+                    src_rels_name = rels_part(slide_part(src_number))
+                    rels = etree.fromstring(src.read(src_rels_name))
+                    for rel in rels:
+                        target = rel.get("Target")
+                        if rel.get("TargetMode") == "External":
+                            continue
+                        if not target.startswith("../media/"):
+                            # Layouts and other shared parts are not copied; the target must already have them
+                            if _resolve(src_rels_name, target) not in taken:
+                                raise ValueError(f"{slide_part(src_number)}: {target} is missing from {target_path}")
+                            continue
+                        data = src.read(posixpath.normpath(posixpath.join("ppt/slides", target)))
+                        digest = hashlib.sha256(data).hexdigest()
+                        if digest not in existing_media:
+                            media_name = _free_media_name(target.rsplit(".", 1)[-1], taken)
+                            taken.add(media_name)
+                            added[media_name] = data
+                            existing_media[digest] = media_name
+                        rel.set("Target", "../media/" + posixpath.basename(existing_media[digest]))
+                    replaced[slide_part(dst_number)] = src.read(slide_part(src_number))
+                    replaced[rels_part(slide_part(dst_number))] = etree.tostring(
+                        rels, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+        # Work out which media parts are still in use after the swap
+        referenced = set()
+        for name in names:
+            if name.endswith(".rels"):
+                referenced.update(rel_targets(name, replaced.get(name) or dst.read(name)))
+
+        content_types = _with_media_defaults(dst.read(CONTENT_TYPES), added)
+
+        tmp_path = target_path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+            for info in dst.infolist():
+                name = info.filename
+                if name.startswith("ppt/media/") and name not in referenced:
+                    continue
+                if name == CONTENT_TYPES:
+                    out.writestr(info, content_types)
+                elif name in replaced:
+                    out.writestr(info, replaced[name])
+                else:
+                    out.writestr(info, dst.read(info))
+            for name, data in added.items():
+                out.writestr(name, data)
+    os.replace(tmp_path, target_path)
+
+def _free_media_name(ext, taken):
+    """First ppt/media/imageN.ext name not in taken"""
+    numbers = [int(m.group(1)) for m in (re.match(r"ppt/media/image(\d+)\.", n) for n in taken) if m]
+    return f"ppt/media/image{max(numbers, default=0) + 1}.{ext}"
+
+def _with_media_defaults(content_types_xml, added):
+    """Add <Default> content types for extensions of newly added media"""
+    types = etree.fromstring(content_types_xml)
+    known = {d.get("Extension").lower() for d in types.iter(f"{{{CT_NS}}}Default")}
+    for name in added:
+        ext = name.rsplit(".", 1)[-1].lower()
+        if ext not in known:
+            default = etree.Element(f"{{{CT_NS}}}Default", Extension=ext,
+                                    ContentType=MEDIA_CONTENT_TYPES.get(ext, "application/octet-stream"))
+            types.insert(0, default)
+            known.add(ext)
+    return etree.tostring(types, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def raw_entries(source):
+    """Read every entry of a zip as (ZipInfo, compressed bytes) without inflating it"""
+    with zipfile.ZipFile(source) as zf:
+        return [(info, _read_raw(zf, info)) for info in zf.infolist()]
+
+def _read_raw(zf, info):
+    """Compressed bytes of one entry of an open ZipFile"""
+    fp = zf.fp
+    fp.seek(info.header_offset)
+    header = LOCAL_HEADER.unpack(fp.read(LOCAL_HEADER.size))
+    fp.seek(header[9] + header[10], os.SEEK_CUR)
+    return fp.read(info.compress_size)
+
+def deflate_entry(info, data, level=zlib.Z_DEFAULT_COMPRESSION):
+    """Compressed (ZipInfo, bytes) entry for new content of the part described by info"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    raw = compressor.compress(data) + compressor.flush()
+    entry = zipfile.ZipInfo(info.filename, info.date_time)
+    entry.compress_type = zipfile.ZIP_DEFLATED
+    entry.external_attr = info.external_attr
+    entry.CRC = zlib.crc32(data)
+    entry.file_size = len(data)
+    entry.compress_size = len(raw)
+    return entry, raw
+
+def write_zip(stream, entries):
+    """Write already-compressed (ZipInfo, bytes) entries as a zip archive to stream
+
+    Sizes and CRCs are known up front, so the stream is written strictly front to
+    back and may be a pipe or socket; nothing is recompressed.
+    """
+    offset = 0
+    central = []
+    for info, raw in entries:
+        name = info.filename.encode("utf-8")
+        flags = UTF8_FLAG if not info.filename.isascii() else 0
+        year, month, day, hour, minute, second = info.date_time
+        dos_time = hour << 11 | minute << 5 | second // 2
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        if offset > ZIP_LIMIT or len(raw) > ZIP_LIMIT or info.file_size > ZIP_LIMIT:
+            raise ValueError(f"{info.filename}: package too large without zip64")
+        stream.write(LOCAL_HEADER.pack(LOCAL_SIGNATURE, 20, flags, info.compress_type, dos_time, dos_date,
+                                       info.CRC, len(raw), info.file_size, len(name), 0))
+        stream.write(name)
+        stream.write(raw)
+        central.append(CENTRAL_HEADER.pack(CENTRAL_SIGNATURE, 20, 20, flags, info.compress_type, dos_time,
+                                           dos_date, info.CRC, len(raw), info.file_size, len(name),
+                                           0, 0, 0, 0, info.external_attr, offset) + name)
+        offset += LOCAL_HEADER.size + len(name) + len(raw)
+    directory = b"".join(central)
+    stream.write(directory)
+    stream.write(END_RECORD.pack(END_SIGNATURE, 0, 0, len(central), len(central),
+                                 len(directory), offset, 0))
+
+def write_deterministic(source, stream):
+    """Write the package in source to stream so that equal content gives equal bytes
+
+    Entries get a fixed timestamp and are ordered by name after [Content_Types].xml,
+    media parts are named after their content hash, and content types are sorted and
+    limited to the parts present. Other parts are copied without recompressing.
+    Returns the sha256 hex digest of the bytes written.
+    """
+    with zipfile.ZipFile(source) as zf:
+        infos = zf.infolist()
+        renames = {}
+        for info in infos:
+            if info.filename.startswith("ppt/media/"):
+                digest = hashlib.sha256()
+                with zf.open(info) as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                ext = info.filename.rsplit(".", 1)[-1].lower()
+                renames[info.filename] = f"ppt/media/image-{digest.hexdigest()[:16]}.{ext}"
+        present = {renames.get(info.filename, info.filename) for info in infos}
+        chosen = {}
+        for info in infos:
+            # Identical media stored twice; every relationship now points at the first copy
+            chosen.setdefault(renames.get(info.filename, info.filename), info)
+        order = sorted(chosen, key=lambda name: (name != CONTENT_TYPES, name))
+
+        def entries():
+            # One part in memory at a time; unchanged parts are copied still compressed
+            for name in order:
+                info = chosen[name]
+                fixed = fixed_info(info, name)
+                if name == CONTENT_TYPES:
+                    yield deflate_entry(fixed, canonical_content_types(zf.read(info), present))
+                elif name.endswith(".rels"):
+                    yield deflate_entry(fixed, _retarget(name, zf.read(info), renames))
+                else:
+                    yield fixed, _read_raw(zf, info)
+
+        hashing = _HashingWriter(stream)
+        write_zip(hashing, entries())
+    return hashing.digest.hexdigest()
+
+def fixed_info(info, name):
+    """Copy of info for name with the fixed timestamp and permissions"""
+    fixed = zipfile.ZipInfo(name, FIXED_DATE_TIME)
+    fixed.compress_type = info.compress_type
+    fixed.external_attr = FILE_ATTRIBUTES
+    fixed.CRC = info.CRC
+    fixed.file_size = info.file_size
+    fixed.compress_size = info.compress_size
+    return fixed
+
+def canonical_content_types(content_types_xml, present):
+    """[Content_Types].xml with sorted Defaults for used extensions and Overrides for present parts"""
+    types = etree.fromstring(content_types_xml)
+    used = {name.rsplit(".", 1)[-1].lower() for name in present} | set(BASE_EXTENSIONS)
+    defaults = {d.get("Extension").lower(): d for d in types.iter(f"{{{CT_NS}}}Default")}
+    overrides = {o.get("PartName"): o for o in types.iter(f"{{{CT_NS}}}Override")}
+    for child in list(types):
+        types.remove(child)
+    for ext in sorted(defaults):
+        if ext in used:
+            types.append(defaults[ext])
+    for part_name in sorted(overrides):
+        if part_name.lstrip("/") in present:
+            types.append(overrides[part_name])
+    return etree.tostring(types, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def _retarget(rels_name, rels_xml, renames):
+    """Re-serialised .rels part with targets of renamed parts updated"""
+    rels = etree.fromstring(rels_xml)
+    source_dir = posixpath.dirname(posixpath.dirname(rels_name))
+    for rel in rels:
+        target = rel.get("Target")
+        if rel.get("TargetMode") == "External" or target.startswith("/"):
+            continue
+        part_name = posixpath.normpath(posixpath.join(source_dir, target))
+        if part_name in renames:
+            rel.set("Target", posixpath.relpath(renames[part_name], source_dir or "."))
+    return etree.tostring(rels, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+class _HashingWriter:
+    """Write-through wrapper that hashes everything written to a stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.stream.write(data)
+
+def optimize_package(source_path, output_path=None, keep_layouts=False):
+    """Shrink a saved .pptx and return {category: (bytes before, bytes after)} plus removal counts
+
+    Drops parts nothing references (after removing layouts no slide uses, unless
+    keep_layouts), explicit relationships nothing names, and duplicate media; recompresses XML at the highest
+    deflate level and never re-deflates already-compressed media (stored, or its existing
+    deflated bytes if those are smaller). Writes output_path
+    (default: over source_path) atomically and deterministically.
+    """
+    with zipfile.ZipFile(source_path) as zf:
+        infos = {info.filename: info for info in zf.infolist()}
+        parts = {name: zf.read(name) for name in infos}
+        # Compressed bytes of already-compressed formats, reused if deflate did beat storing them
+        packed = {name: _read_raw(zf, info) for name, info in infos.items()
+                  if name.rsplit(".", 1)[-1].lower() in STORED_EXTENSIONS
+                  and info.compress_type == zipfile.ZIP_DEFLATED and info.compress_size < info.file_size}
+    before = _category_sizes((name, info.compress_size) for name, info in infos.items())
+
+    xml = {}
+    def tree(name):
+        if name not in xml:
+            xml[name] = etree.fromstring(parts[name])
+        return xml[name]
+
+    # Relationships of explicit types that their part never names
+    stripped = 0
+    for rels_name in [n for n in parts if n.endswith(".rels") and n != "_rels/.rels"]:
+        owner = _owner_part(rels_name)
+        if owner not in parts:
+            continue
+        named = {v for el in tree(owner).iter() for k, v in el.attrib.items() if k.startswith(f"{{{R_NS}}}")}
+        for rel in list(tree(rels_name)):
+            if rel.get("Type") in EXPLICIT_RELS and rel.get("Id") not in named:
+                tree(rels_name).remove(rel)
+                stripped += 1
+
+    # Layouts no slide is based on, keeping at least one per master
+    used_layouts = set()
+    for name in parts:
+        if re.match(r"ppt/slides/_rels/slide\d+\.xml\.rels$", name):
+            used_layouts.update(_targets(name, tree(name), LAYOUT_REL))
+    masters = [] if keep_layouts else [n for n in parts if re.match(r"ppt/slideMasters/_rels/[^/]+\.rels$", n)]
+    for name in masters:
+        rels = tree(name)
+        layout_rels = [rel for rel in rels if rel.get("Type") == LAYOUT_REL]
+        unused = [rel for rel in layout_rels if _resolve(name, rel.get("Target")) not in used_layouts]
+        if len(unused) == len(layout_rels):
+            unused = unused[1:]
+        master = tree(_owner_part(name))
+        for rel in unused:
+            rels.remove(rel)
+            for layout_id in master.iter(f"{{{P_NS}}}sldLayoutId"):
+                if layout_id.get(f"{{{R_NS}}}id") == rel.get("Id"):
+                    layout_id.getparent().remove(layout_id)
+
+    # Duplicate media point at the first copy
+    first_copy = {}
+    duplicates = {}
+    for name in sorted(parts):
+        if name.startswith("ppt/media/"):
+            digest = hashlib.sha256(parts[name]).hexdigest()
+            duplicates[name] = first_copy.setdefault(digest, name)
+    duplicates = {name: kept for name, kept in duplicates.items() if name != kept}
+    for rels_name in [n for n in parts if n.endswith(".rels")]:
+        for rel in tree(rels_name):
+            if rel.get("TargetMode") != "External":
+                target = _resolve(rels_name, rel.get("Target"))
+                if target in duplicates:
+                    rel.set("Target", posixpath.relpath(duplicates[target],
+                                                        posixpath.dirname(posixpath.dirname(rels_name)) or "."))
+
+    # Keep what the package relationships reach
+    for name in xml:
+        parts[name] = etree.tostring(xml[name], xml_declaration=True, encoding="UTF-8", standalone=True)
+    reachable = {CONTENT_TYPES, "_rels/.rels"}
+    stack = ["_rels/.rels"]
+    while stack:
+        rels_name = stack.pop()
+        for target in rel_targets(rels_name, parts[rels_name]):
+            if target in parts and target not in reachable:
+                reachable.add(target)
+                if rels_part(target) in parts:
+                    reachable.add(rels_part(target))
+                    stack.append(rels_part(target))
+    parts[CONTENT_TYPES] = canonical_content_types(parts[CONTENT_TYPES], reachable)
+
+    entries = []
+    for name in sorted(reachable, key=lambda name: (name != CONTENT_TYPES, name)):
+        info = fixed_info(infos[name], name)
+        if name in packed:
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.compress_size = len(packed[name])
+            entries.append((info, packed[name]))
+        elif name.rsplit(".", 1)[-1].lower() in STORED_EXTENSIONS:
+            entries.append(_stored_entry(info, parts[name]))
+        else:
+            entries.append(deflate_entry(info, parts[name], zlib.Z_BEST_COMPRESSION))
+    output_path = output_path or source_path
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write_zip(f, entries)
+    os.replace(tmp_path, output_path)
+
+    after = _category_sizes((info.filename, len(raw)) for info, raw in entries)
+    report = {category: (before.get(category, 0), after.get(category, 0)) for category in before.keys() | after.keys()}
+    report["removed parts"] = len(infos) - len(entries) - len(duplicates)
+    report["removed relationships"] = stripped
+    report["merged media"] = len(duplicates)
+    return report
+
+def _owner_part(rels_name):
+    """Part a .rels part belongs to"""
+    folder, name = posixpath.split(rels_name)
+    return posixpath.join(posixpath.dirname(folder), name[:-len(".rels")])
+
+def _resolve(rels_name, target):
+    """Absolute part name of a relative relationship target"""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(posixpath.dirname(rels_name)), target))
+
+def _targets(rels_name, rels, rel_type):
+    return {_resolve(rels_name, rel.get("Target")) for rel in rels
+            if rel.get("Type") == rel_type and rel.get("TargetMode") != "External"}
+
+def _stored_entry(info, data):
+    """Uncompressed (ZipInfo, bytes) entry for data"""
+    entry = zipfile.ZipInfo(info.filename, info.date_time)
+    entry.compress_type = zipfile.ZIP_STORED
+    entry.external_attr = info.external_attr
+    entry.CRC = zlib.crc32(data)
+    entry.file_size = entry.compress_size = len(data)
+    return entry, data
+
+def _category_sizes(sizes):
+    """Sum (part name, bytes) pairs into xml, media, fonts and other"""
+    totals = {}
+    for name, size in sizes:
+        if name.startswith("ppt/media/"):
+            category = "media"
+        elif name.startswith("ppt/fonts/"):
+            category = "fonts"
+        elif name.endswith((".xml", ".rels")):
+            category = "xml"
+        else:
+            category = "other"
+        totals[category] = totals.get(category, 0) + size
+    return totals
+
+def print_report(report):
+    """Print bytes before and after per category and what was removed"""
+    print(f"{'category':<12}{'before KB':>11}{'after KB':>10}{'saved KB':>10}")
+    saved = 0
+    for category in ("xml", "media", "fonts", "other"):
+        if category in report:
+            old, new = report[category]
+            saved += old - new
+            print(f"{category:<12}{old / 1024:>11.1f}{new / 1024:>10.1f}{(old - new) / 1024:>10.1f}")
+    print(f"📊 Removed {report['removed parts']} parts and {report['removed relationships']} relationships, "
+          f"merged {report['merged media']} duplicate media; {saved / 1024:.1f} KB saved")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimise a saved .pptx package")
+    parser.add_argument("pptx", nargs="+", help=".pptx files to optimise in place")
+    parser.add_argument("-o", "--output", help="write the optimised copy here instead (single input only)")
+    args = parser.parse_args()
+    if args.output and len(args.pptx) > 1:
+        parser.error("--output needs a single input")
+    for path in args.pptx:
+        try:
+            report = optimize_package(path, args.output)
+        except (OSError, zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+            sys.exit(f"❌ Cannot optimise {path}: {e}")
+        print(f"✅ Optimised: {args.output or path}")
+        print_report(report)
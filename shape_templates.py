@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Shape XML templates
+Fast path for the generator: each styled element is built once through python-pptx,
+then deep-copied with only its id, position, size and text filled in
+"""
+
+from copy import deepcopy
+from pptx.oxml.shapes.autoshape import CT_Shape
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.shapes.autoshape import Shape
+from pptx.util import Pt
+
+# Template elements by style; never inserted into a slide themselves
+_text_templates = {}
+
+def text_box_template(font_size, bold, color, align, font_name, ea_font=""):
+    """Empty text box <p:sp> styled like add_text_box output"""
+    key = (font_size, bold, str(color), align, font_name, ea_font)
+    if key not in _text_templates:
+        sp = CT_Shape.new_textbox_sp(0, "", 0, 0, 0, 0)
+        tf = Shape(sp, None).text_frame
+        tf.word_wrap = True
+        p = tf.paragraphs[0]
+        p.font.size = Pt(font_size)
+        p.font.bold = bold
+        p.font.color.rgb = color
+        p.font.name = font_name
+        p.alignment = align
+        if ea_font:
+            ea = OxmlElement("a:ea")
+            ea.set("typeface", ea_font)
+            p.font._rPr.latin.addnext(ea)
+        _text_templates[key] = sp
+    return _text_templates[key]
+
+def clone_text_box(slide, left, top, width, height, text, font_size, bold, color, align, font_name, ea_font=""):
+    """Append a copy of the matching text box template to slide"""
+    shapes = slide.shapes
+    sp = deepcopy(text_box_template(font_size, bold, color, align, font_name, ea_font))
+    shape_id = shapes._next_shape_id
+    _place(sp, shape_id, "TextBox %d" % (shape_id - 1), left, top, width, height)
+    sp.txBody.p_lst[0].append_text(text)
+    shapes._spTree.insert_element_before(sp, "p:extLst")
+    return sp
+
+def _place(sp, shape_id, name, x, y, cx, cy):
+    """Set id, name, position and size (all in EMU) of a cloned shape"""
+    # Raw lxml access: p:nvSpPr/p:cNvPr and p:spPr/a:xfrm/(a:off, a:ext) are fixed
+    # positions in every template, so skip the python-pptx attribute descriptors
+    c_nv_pr = sp[0][0]
+    c_nv_pr.set("id", str(shape_id))
+    c_nv_pr.set("name", name)
+    off, ext = sp[1][0]
+    off.set("x", str(x))
+    off.set("y", str(y))
+    ext.set("cx", str(cx))
+    ext.set("cy", str(cy))
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Responsive site images
+Derives AVIF, WebP and JPEG copies of the site's photos at several widths from one
+decode per source, cached on disk, and rewrites <img> tags with srcset, sizes and lazy loading
+"""
+
+from PIL import Image, ImageOps, features
+from concurrent.futures import ProcessPoolExecutor
+from image_cache import BASE_PATH, CACHE_PATH, file_hash
+import argparse
+import asset_index
+import html
+import os
+import re
+import shutil
+import sys
+import time
+import unicodedata
+
+SITE_IMAGE_CACHE_PATH = os.path.join(CACHE_PATH, "site_images")
+SITE_PATH = os.path.join(BASE_PATH, "dist")
+# Derivatives live in this folder of the output, named after their source
+RESPONSIVE_FOLDER = "images/responsive"
+DEFAULT_PAGES = ("index.html",)
+
+# Widths in pixels; sources narrower than a width get one copy at their own width instead
+WIDTHS = (400, 800, 1200, 1600)
+# The <img src> for browsers without srcset, and the lightbox copy
+FALLBACK_WIDTH = 800
+
+# Encoders best first: (extension, MIME type, Pillow format, save options)
+FORMATS = (
+    ("avif", "image/avif", "AVIF", {"quality": 55}),
+    ("webp", "image/webp", "WEBP", {"quality": 75, "method": 6}),
+)
+# The ones this Pillow build can write; AVIF needs Pillow 11.2 or later with libavif, and
+# formats it cannot write are left out of the <picture> like brotli and fontTools are optional
+ENCODERS = tuple(f for f in FORMATS if features.check(f[2].lower()))
+JPEG_FORMAT = ("jpg", "image/jpeg", "JPEG", {"quality": 78, "optimize": True, "progressive": True})
+PNG_FORMAT = ("png", "image/png", "PNG", {"optimize": True})
+
+# Rendered slot widths per class of the element around an <img>, from the breakpoints in css/main.css
+SIZES = {
+    "about-image": "(max-width: 768px) calc(100vw - 40px), 560px",
+    "product-image": "(max-width: 768px) min(calc(100vw - 40px), 400px), (max-width: 1024px) 50vw, 270px",
+    "gallery-item": "(max-width: 480px) calc(100vw - 40px), (max-width: 768px) 50vw, "
+                    "(max-width: 1024px) 33vw, 290px",
+}
+DEFAULT_SIZES = "100vw"
+
+IMG_PATTERN = re.compile(r"<img\b([^>]*?)\s*/?>", re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+CLASS_PATTERN = re.compile(r"""class\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+# Attributes the rewrite sets; the page's own values are replaced, except sizes and loading
+GENERATED_ATTRIBUTES = ("src", "srcset", "sizes", "width", "height", "loading", "decoding", "data-full")
+
+def missing_encoders():
+    """Names of the formats this Pillow build cannot write, e.g. ["AVIF"]"""
+    return [f[2] for f in FORMATS if f not in ENCODERS]
+
+def slug(rel_path):
+    """Lowercase ASCII name for an image path below images/, e.g. new/WhatsApp Image (1).jpeg -> new-whatsapp-image-1"""
+    stem = os.path.splitext(rel_path)[0]
+    ascii_stem = unicodedata.normalize("NFKD", stem).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_stem.lower()).strip("-") or "image"
+
+def derivative_widths(width):
+    """Widths to derive from a source width pixels wide, never upscaling"""
+    return sorted({min(w, width) for w in WIDTHS})
+
+def source_formats(info):
+    """Formats to derive for a source: AVIF and WebP where available, then JPEG, or PNG for transparent images"""
+    return ENCODERS + ((PNG_FORMAT if info.alpha else JPEG_FORMAT),)
+
+def derive(full_path, jobs=1):
+    """{extension: [(width, height, cache path)]} of every derivative of one source image"""
+    return derive_images([full_path], jobs)[full_path]
+
+def derive_images(full_paths, jobs=1):
+    """{full path: {extension: [(width, height, cache path)]}} for several sources
+
+    Sources with missing cache entries are decoded once each, in up to jobs worker
+    processes, and every width and format is encoded from that one decode.
+    """
+    results = {}
+    missing = []
+    for full_path in full_paths:
+        info = asset_index.lookup(full_path)
+        if info is None:
+            raise ValueError(f"{full_path}: not a readable JPEG or PNG file")
+        source_hash = file_hash(full_path)
+        width, height = info.oriented_size
+        derivatives = {}
+        for ext, _, _, _ in source_formats(info):
+            derivatives[ext] = [(w, round(height * w / width), _cache_file(source_hash, w, ext))
+                                for w in derivative_widths(width)]
+        results[full_path] = derivatives
+        if not all(os.path.exists(path) for sizes in derivatives.values() for _, _, path in sizes):
+            missing.append((full_path, info.alpha, derivatives))
+    if jobs > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(missing))) as pool:
+            list(pool.map(_derive, *zip(*missing)))
+    else:
+        for args in missing:
+            _derive(*args)
+    asset_index.save_index()
+    return results
+
+def _derive(full_path, alpha, derivatives):
+    """Decode one source and write its missing derivatives into the cache (worker process entry point)"""
+    os.makedirs(SITE_IMAGE_CACHE_PATH, exist_ok=True)
+    with Image.open(full_path) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if alpha else "RGB")
+        resized = {}
+        for ext, sizes in derivatives.items():
+            _, _, pil_format, options = _format(ext)
+            for width, height, cache_file in sizes:
+                if os.path.exists(cache_file):
+                    continue
+                if (width, height) not in resized:
+                    resized[(width, height)] = img if img.size == (width, height) else \
+                        img.resize((width, height), Image.LANCZOS)
+                # Write to a temp name first so an interrupted build never leaves a truncated cache entry
+                tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                resized[(width, height)].save(tmp_file, pil_format, **options)
+                os.replace(tmp_file, cache_file)
+
+def _format(ext):
+    return next(f for f in FORMATS + (JPEG_FORMAT, PNG_FORMAT) if f[0] == ext)
+
+def _cache_file(source_hash, width, ext):
+    quality = _format(ext)[3].get("quality", 0)
+    return os.path.join(SITE_IMAGE_CACHE_PATH, f"{source_hash[:16]}-{width}w-q{quality}.{ext}")
+
+def publish(derivatives, rel_path, output_dir):
+    """Link (or copy) the cached derivatives of one source into output_dir
+
+    Returns {extension: [(width, height, URL path relative to output_dir)]}.
+    """
+    name = slug(rel_path)
+    folder = os.path.join(output_dir, *RESPONSIVE_FOLDER.split("/"))
+    os.makedirs(folder, exist_ok=True)
+    published = {}
+    for ext, sizes in derivatives.items():
+        published[ext] = []
+        for width, height, cache_file in sizes:
+            filename = f"{name}-{width}.{ext}"
+            target = os.path.join(folder, filename)
+            if not (os.path.exists(target) and os.path.samefile(target, cache_file)):
+                if os.path.exists(target):
+                    os.remove(target)
+                try:
+                    os.link(cache_file, target)
+                except OSError:
+                    shutil.copyfile(cache_file, target)
+            published[ext].append((width, height, f"{RESPONSIVE_FOLDER}/{filename}"))
+    return published
+
+def picture_markup(published, attributes, sizes, indent):
+    """<picture> element with AVIF and WebP sources and a fallback <img> carrying attributes"""
+    # source_formats puts the JPEG or PNG fallback last
+    fallback = list(published.values())[-1]
+    width, height, src = min(fallback, key=lambda d: (abs(d[0] - FALLBACK_WIDTH), d[0]))
+    own = dict((name.lower(), value) for name, value in attributes)
+    sizes = own.get("sizes") or sizes
+    img_attributes = [(name, value) for name, value in attributes if name.lower() not in GENERATED_ATTRIBUTES]
+    img_attributes[:0] = [("src", src)]
+    img_attributes += [("srcset", _srcset(fallback)), ("sizes", sizes), ("width", str(width)),
+                       ("height", str(height)), ("loading", own.get("loading") or "lazy"), ("decoding", "async"),
+                       ("data-full", published.get("webp", fallback)[-1][2])]
+    lines = ["<picture>"]
+    for ext, mime, _, _ in ENCODERS:
+        lines.append(f'{indent}    <source type="{mime}" srcset="{_srcset(published[ext])}" sizes="{sizes}">')
+    lines.append(f"{indent}    <img {_attributes(img_attributes)}>")
+    lines.append(f"{indent}</picture>")
+    return "\n".join(lines)
+
+def _srcset(sizes):
+    return ", ".join(f"{url} {width}w" for width, _, url in sizes)
+
+def _attributes(attributes):
+    return " ".join(name if value is None else f'{name}="{html.escape(value)}"' for name, value in attributes)
+
+def parse_attributes(text):
+    """[(name, value or None)] of an HTML tag's attribute text, entities decoded"""
+    attributes = []
+    for match in ATTRIBUTE_PATTERN.finditer(text):
+        name, *values = match.groups()
+        value = next((v for v in values if v is not None), None)
+        attributes.append((name, None if value is None else html.unescape(value)))
+    return attributes
+
+def local_image(src, page_dir):
+    """Full path of the image file a page's src points at, or None if it is not a local image"""
+    if not src or re.match(r"^([a-z][a-z0-9+.-]*:|//|#)", src, re.IGNORECASE):
+        return None
+    full_path = os.path.normpath(os.path.join(page_dir, *src.split("?")[0].split("/")))
+    if not full_path.lower().endswith(asset_index.IMAGE_EXTENSIONS) or not os.path.isfile(full_path):
+        return None
+    return full_path
+
+def slot_sizes(page, position):
+    """sizes value for an <img> at position, from the class of the nearest element opened before it"""
+    classes = CLASS_PATTERN.findall(page, 0, position)
+    names = classes[-1].split() if classes else []
+    return next((SIZES[name] for name in names if name in SIZES), DEFAULT_SIZES)
+
+def rewrite_page(page, page_dir, output_dir, jobs=1):
+    """Page markup with every local <img> turned into a responsive <picture>, as (markup, source count)"""
+    tags = []
+    for match in IMG_PATTERN.finditer(page):
+        attributes = parse_attributes(match.group(1))
+        full_path = local_image(dict((n.lower(), v) for n, v in attributes).get("src"), page_dir)
+        if full_path is not None:
+            tags.append((match, attributes, full_path))
+    derivatives = derive_images(sorted({full_path for _, _, full_path in tags}), jobs)
+    parts = []
+    last = 0
+    for match, attributes, full_path in tags:
+        rel_path = os.path.relpath(full_path, asset_index.IMAGES_PATH)
+        if rel_path.startswith(".."):
+            rel_path = os.path.relpath(full_path, BASE_PATH)
+        published = publish(derivatives[full_path], rel_path, output_dir)
+        line_start = page.rfind("\n", 0, match.start()) + 1
+        indent = re.match(r"[ \t]*", page[line_start:match.start()]).group(0)
+        parts.append(page[last:match.start()])
+        parts.append(picture_markup(published, attributes, slot_sizes(page, match.start()), indent))
+        last = match.end()
+    parts.append(page[last:])
+    return "".join(parts), len(derivatives)
+
+def write_site_images(pages=DEFAULT_PAGES, output_dir=SITE_PATH, jobs=1):
+    """Rewrite pages into output_dir with their derivatives beside them, returns the output paths"""
+    written = []
+    for page_path in pages:
+        full_page = os.path.join(BASE_PATH, page_path)
+        with open(full_page, encoding="utf-8") as f:
+            page = f.read()
+        markup, sources = rewrite_page(page, os.path.dirname(full_page), output_dir, jobs)
+        output_path = os.path.join(output_dir, os.path.relpath(full_page, BASE_PATH))
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(markup)
+        print(f"🖼️  {page_path}: {sources} images made responsive")
+        written.append(output_path)
+    folder = os.path.join(output_dir, *RESPONSIVE_FOLDER.split("/"))
+    if os.path.isdir(folder):
+        total = sum(entry.stat().st_size for entry in os.scandir(folder))
+        print(f"📊 {len(os.listdir(folder))} derivatives, {total / 1024 / 1024:.1f} MB")
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make the images of TALIJA site pages responsive")
+    parser.add_argument("pages", nargs="*", default=list(DEFAULT_PAGES), help="HTML pages (default: index.html)")
+    parser.add_argument("-o", "--output-dir", default=SITE_PATH, help="folder for the rewritten pages (default: dist/)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for encoding (default: 1)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if missing_encoders():
+        print(f"⚠️  Pillow cannot write {', '.join(missing_encoders())}, those image sources are left out "
+              f"(pip install -U pillow)", file=sys.stderr)
+    try:
+        paths = write_site_images(args.pages, args.output_dir, args.jobs)
+    except (OSError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    for path in paths:
+        print(f"✅ Page saved to: {path}")
+    print(f"⏱️  {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - HTML presentation
+Renders the slide model to a scroll-snapping web page with the deck's prepared images,
+loading only the current and next slide's pictures eagerly
+"""
+
+from PIL import Image
+from create_pptx import (BASE_PATH, DARK_SOFT, GOLD, SLIDE_NUMBER_BOX, SLIDE_NUMBER_SIZE, THEMES, deck_font,
+                         load_fitted_deck, picture_frame, slide_number_text)
+from deck_spec import DEFAULT_SPEC, Picture, Shape, SpecError, Text
+from slide_preview import CORNER_RATIO
+from text_fit import INSET_X, INSET_Y, LINE_SPACING
+import argparse
+import html
+import os
+import shutil
+import sys
+import time
+
+# Pictures and the web font go into a folder named after the page, e.g. presentation_files/
+FILES_SUFFIX = "_files"
+# Slides from the top whose pictures load with the page; later ones load one slide ahead
+EAGER_SLIDES = 2
+# Outline width of shapes in points, as python-pptx draws them
+LINE_WIDTH = 0.75
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{font_face}        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+
+        html {{
+            scroll-behavior: smooth;
+            scroll-snap-type: y mandatory;
+        }}
+
+        body {{
+            background: {page_background};
+            overflow-x: hidden;
+        }}
+
+        .slide {{
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            scroll-snap-align: start;
+        }}
+
+        /* The stage keeps the deck's aspect ratio; 1em is a hundredth of its width */
+        .stage {{
+            position: relative;
+            width: min(100vw, calc(100vh * {ratio}));
+            height: min(calc(100vw / {ratio}), 100vh);
+            font-size: min(1vw, calc(1vh * {ratio}));
+            overflow: hidden;
+            font-family: {font_family};
+        }}
+
+        .text, .shape, .picture {{
+            position: absolute;
+        }}
+
+        .text {{
+            padding: {inset_y}% {inset_x}%;
+            line-height: {line_spacing};
+            white-space: pre-wrap;
+            overflow-wrap: break-word;
+        }}
+
+        .picture {{
+            object-fit: fill;
+        }}
+
+        .nav-dots {{
+            position: fixed;
+            right: 20px;
+            top: 50%;
+            transform: translateY(-50%);
+            display: flex;
+            flex-direction: column;
+            gap: 10px;
+            z-index: 100;
+        }}
+
+        .nav-dot {{
+            width: 10px;
+            height: 10px;
+            border: none;
+            border-radius: 50%;
+            background: rgba(255, 255, 255, 0.3);
+            cursor: pointer;
+        }}
+
+        .nav-dot.active {{
+            background: {accent};
+        }}
+
+        @media (orientation: landscape) {{
+            .slide {{
+                height: 100vh;
+            }}
+        }}
+
+        @media (orientation: portrait) {{
+            html {{
+                scroll-snap-type: none;
+            }}
+
+            .nav-dots {{
+                display: none;
+            }}
+        }}
+
+        @media print {{
+            .slide {{
+                height: auto;
+                page-break-after: always;
+            }}
+
+            .nav-dots {{
+                display: none;
+            }}
+        }}
+    </style>
+</head>
+<body>
+{slides}
+    <nav class="nav-dots">
+{dots}
+    </nav>
+
+    <script>
+        const slides = Array.from(document.querySelectorAll('.slide'));
+        const dots = document.querySelectorAll('.nav-dot');
+        let current = 0;
+
+        // Later slides' pictures are lazy; start loading them one slide ahead of the reader
+        function show(index)
+        {{
+            current = index;
+            dots.forEach((dot, i) => dot.classList.toggle('active', i === index));
+            [index, index + 1].forEach(i =>
+            {{
+                if (slides[i])
+                {{
+                    slides[i].querySelectorAll('img[loading="lazy"]').forEach(img => img.loading = 'eager');
+                }}
+            }});
+        }}
+
+        const observer = new IntersectionObserver(entries =>
+        {{
+            entries.forEach(entry =>
+            {{
+                if (entry.isIntersecting)
+                {{
+                    show(slides.indexOf(entry.target));
+                }}
+            }});
+        }}, {{ threshold: 0.5 }});
+
+        slides.forEach(slide => observer.observe(slide));
+        dots.forEach((dot, i) => dot.addEventListener('click', () => slides[i].scrollIntoView({{ behavior: 'smooth' }})));
+
+        document.addEventListener('keydown', e =>
+        {{
+            let target = null;
+            if (e.key === 'ArrowDown' || e.key === 'ArrowRight' || e.key === 'PageDown' || e.key === ' ')
+            {{
+                target = Math.min(current + 1, slides.length - 1);
+            }}
+            else if (e.key === 'ArrowUp' || e.key === 'ArrowLeft' || e.key === 'PageUp')
+            {{
+                target = Math.max(current - 1, 0);
+            }}
+            if (target !== null)
+            {{
+                e.preventDefault();
+                slides[target].scrollIntoView({{ behavior: 'smooth' }});
+            }}
+        }});
+    </script>
+</body>
+</html>
+"""
+
+FONT_FACE_TEMPLATE = """        @font-face {{
+            font-family: "{typeface}";
+            src: url("{url}") format("truetype");
+            font-display: swap;
+        }}
+
+"""
+
+def css_color(rgb):
+    return "#{:02X}{:02X}{:02X}".format(*rgb)
+
+def font_family(typeface, ea_font=""):
+    """CSS font stack of a latin typeface and its East Asian companion"""
+    families = [typeface] + ([ea_font] if ea_font else [])
+    return ", ".join(f'"{name}"' for name in families) + ", sans-serif"
+
+def render_html(deck, image_urls, font_url=None):
+    """The deck as one HTML page
+
+    image_urls maps prepared image paths to the URLs the page uses for them, and
+    font_url is the URL of the embedded East Asian font, if any.
+    """
+    ea_typeface = deck.ea_font.typeface if deck.ea_font else ""
+    default_family = font_family("Arial", ea_typeface)
+    total = len(deck.slides)
+    slides = []
+    for number, slide in enumerate(deck.slides, 1):
+        elements = [_element(deck, element, image_urls, number <= EAGER_SLIDES, default_family)
+                    for element in slide.elements]
+        number_box = Text(SLIDE_NUMBER_BOX, slide_number_text(number, total), SLIDE_NUMBER_SIZE,
+                          color=slide.number_color, align="right", ea_font=ea_typeface)
+        elements.append(_element(deck, number_box, image_urls, True, default_family))
+        slides.append(f'    <section class="slide" id="slide-{number:02d}" '
+                      f'style="background: {css_color(THEMES[slide.background])};">\n'
+                      f'        <div class="stage">\n'
+                      + "".join(f"            {e}\n" for e in elements if e) +
+                      f"        </div>\n"
+                      f"    </section>\n")
+    dots = "\n".join(f'        <button class="nav-dot" aria-label="{number}"></button>'
+                     for number in range(1, total + 1))
+    font_face = FONT_FACE_TEMPLATE.format(typeface=ea_typeface, url=font_url) if font_url else ""
+    return PAGE_TEMPLATE.format(
+        lang=deck.locales[0] if deck.locales else "en", title=html.escape(deck.title), font_face=font_face,
+        page_background=css_color(THEMES[deck.slides[0].background]), ratio=round(deck.size[0] / deck.size[1], 4),
+        font_family=default_family, inset_y=_percent(INSET_Y / 72, deck), inset_x=_percent(INSET_X / 72, deck),
+        line_spacing=LINE_SPACING, accent=css_color(GOLD), slides="\n".join(slides), dots=dots)
+
+def _element(deck, element, image_urls, eager, default_family):
+    """HTML of one slide element, positioned in percent of the slide"""
+    if isinstance(element, Text):
+        style = _box_style(deck, element.box)
+        style += f" font-size: {_em(element.size / 72, deck)}em; color: {css_color(element.color)};"
+        if element.bold:
+            style += " font-weight: bold;"
+        if element.align != "left":
+            style += f" text-align: {element.align};"
+        family = font_family(element.font, element.ea_font)
+        if family != default_family:
+            style += f" font-family: {html.escape(family)};"
+        return f'<div class="text" style="{style}">{html.escape(element.text)}</div>'
+    if isinstance(element, Picture):
+        frame = picture_frame(element)
+        if frame is None:
+            left, top, width, height = element.box
+            return _shape_html(deck, "rectangle", (left, top, width or 4, height or 3), DARK_SOFT, GOLD)
+        _, box, prepared = frame
+        fit = "cover" if element.fit == "cover" and element.box[2] and element.box[3] else "fill"
+        style = _box_style(deck, box) + (" object-fit: cover;" if fit == "cover" else "")
+        image_width, image_height = _pixel_size(prepared)
+        return (f'<img class="picture" src="{html.escape(image_urls[prepared])}" alt="{html.escape(deck.title)}" '
+                f'width="{image_width}" height="{image_height}" sizes="{round(box[2] / deck.size[0] * 100)}vw" '
+                f'loading="{"eager" if eager else "lazy"}" decoding="async" style="{style}">')
+    if isinstance(element, Shape):
+        return _shape_html(deck, element.shape, element.box, element.fill, element.line)
+    return ""
+
+def _shape_html(deck, shape, box, fill, line):
+    style = _box_style(deck, box) + f" background: {css_color(fill)};"
+    if line:
+        style += f" border: {_em(LINE_WIDTH / 72, deck)}em solid {css_color(line)};"
+    if shape == "rounded_rectangle":
+        style += f" border-radius: {_em(min(box[2], box[3]) * CORNER_RATIO, deck)}em;"
+    return f'<div class="shape" style="{style}"></div>'
+
+def _box_style(deck, box):
+    left, top, width, height = box
+    return (f"left: {_percent(left, deck)}%; top: {_percent(top, deck, 1)}%; "
+            f"width: {_percent(width, deck)}%; height: {_percent(height, deck, 1)}%;")
+
+def _percent(inches, deck, axis=0):
+    return round(inches / deck.size[axis] * 100, 3)
+
+def _em(inches, deck):
+    """Length in ems of the stage font, a hundredth of the slide width"""
+    return round(inches / deck.size[0] * 100, 4)
+
+def _pixel_size(path):
+    with Image.open(path) as image:
+        return image.size
+
+def files_folder(html_path):
+    """Folder beside html_path that holds its pictures and font"""
+    return os.path.splitext(html_path)[0] + FILES_SUFFIX
+
+def publish_files(paths, folder):
+    """Link (or copy) cached files into folder under their cache names, removing ones no longer used
+
+    Returns {path: URL relative to the page}.
+    """
+    os.makedirs(folder, exist_ok=True)
+    urls = {}
+    for path in paths:
+        name = os.path.basename(path)
+        target = os.path.join(folder, name)
+        if not os.path.exists(target):
+            try:
+                os.link(path, target)
+            except OSError:
+                shutil.copyfile(path, target)
+        urls[path] = f"{os.path.basename(folder)}/{name}"
+    used = {os.path.basename(path) for path in paths}
+    for entry in os.scandir(folder):
+        if entry.is_file() and entry.name not in used:
+            os.remove(entry.path)
+    return urls
+
+def write_html(deck, html_path):
+    """Write the deck's HTML page and its files, returns whether the page changed"""
+    prepared = []
+    for slide in deck.slides:
+        for element in slide.elements:
+            frame = picture_frame(element) if isinstance(element, Picture) else None
+            if frame is not None and frame[2] not in prepared:
+                prepared.append(frame[2])
+    font_path = deck_font(deck)
+    folder = files_folder(html_path)
+    urls = publish_files(prepared + ([font_path] if font_path else []), folder)
+    page = render_html(deck, urls, urls.get(font_path))
+    try:
+        with open(html_path, encoding="utf-8") as f:
+            if f.read() == page:
+                return False
+    except OSError:
+        pass
+    tmp_path = html_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(page)
+    os.replace(tmp_path, html_path)
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a TALIJA deck spec as an HTML presentation")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("-o", "--output", help="output .html path (default: the spec's html next to this script)")
+    parser.add_argument("-l", "--locales", metavar="LANGS", help="locale list, e.g. sr+en (default: the spec's locales)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        deck = load_fitted_deck(args.spec, args.locales.split("+") if args.locales else None)
+    except SpecError as e:
+        sys.exit(f"❌ Invalid deck spec: {e}")
+    html_path = args.output or os.path.join(BASE_PATH, deck.html or deck.name + ".html")
+    changed = write_html(deck, html_path)
+    print(f"✅ HTML presentation {'saved to' if changed else 'up to date'}: {html_path}")
+    print(f"⏱️  {time.perf_counter() - start:.2f}s")
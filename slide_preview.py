@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Slide previews
+Rasterises the slide model to small PNGs with Pillow, without PowerPoint or LibreOffice,
+caches them per slide content hash and tiles them into a contact sheet
+"""
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from concurrent.futures import ProcessPoolExecutor
+from create_pptx import (BASE_PATH, DARK_SOFT, GOLD, SLIDE_NUMBER_BOX, SLIDE_NUMBER_SIZE, THEMES, image_hashes,
+                         load_fitted_deck, picture_frame, slide_number_text)
+from deck_spec import DEFAULT_SPEC, Picture, Shape, SpecError, Text
+from image_cache import CACHE_PATH, file_hash
+from text_fit import INSET_X, INSET_Y, LINE_SPACING, metric_font, text_width, wrap_lines
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import time
+import unicodedata
+
+PREVIEW_CACHE_PATH = os.path.join(CACHE_PATH, "previews")
+PREVIEWS_PATH = os.path.join(BASE_PATH, "previews")
+
+# Thumbnail and contact sheet layout in pixels
+PREVIEW_WIDTH = 480
+SHEET_COLUMNS = 4
+SHEET_GAP = 8
+SHEET_BACKGROUND = (32, 32, 32)
+
+# Rounded rectangles use PowerPoint's default corner of a sixth of the shorter side
+CORNER_RATIO = 1 / 6
+# Baseline of the first line below the top inset, in ems
+BASELINE = 0.95
+
+# Sized preview fonts per (typeface, bold, pixel size)
+_fonts = {}
+
+def preview_font(typeface, bold, pixels, path=None):
+    """FreeType font for drawing text at pixels per em, from path or the metric font of typeface"""
+    key = (path or typeface, bold, pixels)
+    if key not in _fonts:
+        if path:
+            font = ImageFont.truetype(path, pixels)
+        else:
+            base, correction = metric_font(typeface, bold)
+            # Stand-in fonts are drawn smaller by their width correction so lines keep the measured width
+            font = base.font_variant(size=max(1, round(pixels * correction))) if base else ImageFont.load_default(pixels)
+        _fonts[key] = font
+    return _fonts[key]
+
+def preview_key(deck, slide, number, width, ea_font_path):
+    """Content hash of one slide preview: slide model, images, fonts, size and renderer code"""
+    digest = hashlib.sha256()
+    for module in ("slide_preview.py", "text_fit.py"):
+        with open(os.path.join(BASE_PATH, module), "rb") as f:
+            digest.update(f.read())
+    images = image_hashes(slide.images)
+    font_hash = file_hash(ea_font_path) if ea_font_path else None
+    digest.update(f"{slide.key}|{number}|{len(deck.slides)}|{deck.size}|{width}|{sorted(images.items())}|"
+                  f"{font_hash}".encode("utf-8"))
+    return digest.hexdigest()
+
+def render_preview(slide, number, total, size, width=PREVIEW_WIDTH, ea_font_path=None):
+    """Rasterise one slide model to an RGB image width pixels wide"""
+    ppi = width / size[0]
+    image = Image.new("RGB", (width, round(size[1] * ppi)), tuple(THEMES[slide.background]))
+    draw = ImageDraw.Draw(image)
+    for element in slide.elements:
+        if isinstance(element, Text):
+            _draw_text(draw, element, ppi, ea_font_path)
+        elif isinstance(element, Picture):
+            _draw_picture(image, draw, element, ppi)
+        elif isinstance(element, Shape):
+            _draw_shape(draw, element.shape, element.box, element.fill, element.line, ppi)
+    number_box = Text(SLIDE_NUMBER_BOX, slide_number_text(number, total), SLIDE_NUMBER_SIZE,
+                      color=slide.number_color, align="right")
+    _draw_text(draw, number_box, ppi, ea_font_path)
+    return image
+
+def _draw_shape(draw, shape, box, fill, line, ppi):
+    left, top, width, height = (v * ppi for v in box)
+    rect = [left, top, left + max(width, 1), top + max(height, 1)]
+    outline = tuple(line) if line else None
+    line_width = max(1, round(0.75 * ppi / 72)) if line else 0
+    if shape == "rounded_rectangle":
+        draw.rounded_rectangle(rect, min(width, height) * CORNER_RATIO, tuple(fill), outline, line_width)
+    else:
+        draw.rectangle(rect, tuple(fill), outline, line_width)
+
+def _draw_picture(image, draw, element, ppi):
+    frame = picture_frame(element)
+    if frame is None:
+        left, top, width, height = element.box
+        _draw_shape(draw, "rectangle", (left, top, width or 4, height or 3), DARK_SOFT, GOLD, ppi)
+        return
+    # Same frame as add_image_safe, so the build's prepared copy is reused
+    _, (left, top, width, height), prepared = frame
+    pixels = (max(1, round(width * ppi)), max(1, round(height * ppi)))
+    with Image.open(prepared) as picture:
+        # JPEG decodes straight at a fraction of its size when the thumbnail is much smaller
+        picture.draft("RGB", pixels)
+        picture = picture.convert("RGBA" if picture.mode in ("RGBA", "LA", "P") else "RGB")
+        if element.fit == "cover" and element.box[2] and element.box[3]:
+            picture = ImageOps.fit(picture, pixels, Image.BILINEAR)
+        else:
+            picture = picture.resize(pixels, Image.BILINEAR)
+        image.paste(picture, (round(left * ppi), round(top * ppi)), picture if picture.mode == "RGBA" else None)
+
+def _draw_text(draw, element, ppi, ea_font_path):
+    left, top, width, _ = element.box
+    scale = ppi / 72
+    pixels = max(1, round(element.size * scale))
+    font = preview_font(element.font, element.bold, pixels)
+    wide_font = preview_font(element.ea_font, element.bold, pixels, ea_font_path) if ea_font_path else None
+    color = tuple(element.color)
+    for i, line in enumerate(wrap_lines(element.text, element.size, width, element.font, element.bold)):
+        line = line.rstrip()
+        line_width = text_width(line, element.size, element.font, element.bold) * scale
+        x = left * ppi + INSET_X * scale
+        if element.align == "center":
+            x = (left + width / 2) * ppi - line_width / 2
+        elif element.align == "right":
+            x = (left + width) * ppi - INSET_X * scale - line_width
+        y = top * ppi + INSET_Y * scale + (i * LINE_SPACING + BASELINE) * pixels
+        # Runs of wide characters go to the East Asian font, like the <a:ea> typeface in the deck
+        for run in _runs(line):
+            run_width = text_width(run, element.size, element.font, element.bold) * scale
+            if _is_wide(run[0]) and wide_font is None:
+                # Without an East Asian font, wide characters are drawn as outlined cells
+                for n in range(len(run)):
+                    cell = [x + n * pixels + 1, y - pixels * 0.85, x + (n + 1) * pixels - 1, y + pixels * 0.1]
+                    draw.rectangle(cell, outline=color)
+            else:
+                draw.text((x, y), run, color, wide_font if _is_wide(run[0]) else font, anchor="ls")
+            x += run_width
+
+def _runs(line):
+    """Split line into runs of wide and of other characters"""
+    runs = []
+    for char in line:
+        if runs and _is_wide(runs[-1][-1]) == _is_wide(char):
+            runs[-1] += char
+        else:
+            runs.append(char)
+    return runs
+
+def _is_wide(char):
+    return unicodedata.east_asian_width(char) in ("W", "F")
+
+def _render_to_cache(slide, number, total, size, width, ea_font_path, cache_file):
+    """Render one slide preview into the cache (worker process entry point)"""
+    image = render_preview(slide, number, total, size, width, ea_font_path)
+    os.makedirs(PREVIEW_CACHE_PATH, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    image.save(tmp_file, "PNG", optimize=False)
+    os.replace(tmp_file, cache_file)
+    return cache_file
+
+def slide_previews(deck, width=PREVIEW_WIDTH, jobs=1):
+    """Cached preview PNG paths of every slide of deck, in order, as (paths, rendered count)"""
+    ea_font_path = None
+    if deck.ea_font and os.path.exists(os.path.join(BASE_PATH, deck.ea_font.path)):
+        ea_font_path = os.path.join(BASE_PATH, deck.ea_font.path)
+    total = len(deck.slides)
+    paths = []
+    missing = []
+    for number, slide in enumerate(deck.slides, 1):
+        cache_file = os.path.join(PREVIEW_CACHE_PATH, preview_key(deck, slide, number, width, ea_font_path) + ".png")
+        paths.append(cache_file)
+        if not os.path.exists(cache_file):
+            missing.append((slide, number, total, deck.size, width, ea_font_path, cache_file))
+    if jobs > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(missing))) as pool:
+            list(pool.map(_render_to_cache, *zip(*missing)))
+    else:
+        for args in missing:
+            _render_to_cache(*args)
+    return paths, len(missing)
+
+def contact_sheet(paths, columns=SHEET_COLUMNS, gap=SHEET_GAP):
+    """Tile preview PNGs into one image, left to right and top to bottom"""
+    tiles = [Image.open(path) for path in paths]
+    tile_width = max(t.width for t in tiles)
+    tile_height = max(t.height for t in tiles)
+    rows = -(-len(tiles) // columns)
+    columns = min(columns, len(tiles))
+    sheet = Image.new("RGB", (columns * (tile_width + gap) + gap, rows * (tile_height + gap) + gap),
+                      SHEET_BACKGROUND)
+    for i, tile in enumerate(tiles):
+        row, column = divmod(i, columns)
+        sheet.paste(tile, (gap + column * (tile_width + gap), gap + row * (tile_height + gap)))
+        tile.close()
+    return sheet
+
+def write_previews(spec_path=DEFAULT_SPEC, output_dir=PREVIEWS_PATH, locales=None, width=PREVIEW_WIDTH, jobs=1,
+                   columns=SHEET_COLUMNS):
+    """Write slideNN_<name>.png per slide and contact_sheet.png into output_dir, returns the sheet path"""
+    deck = load_fitted_deck(spec_path, locales)
+    paths, rendered = slide_previews(deck, width, jobs)
+    os.makedirs(output_dir, exist_ok=True)
+    for number, (slide, path) in enumerate(zip(deck.slides, paths), 1):
+        shutil.copyfile(path, os.path.join(output_dir, f"slide{number:02d}_{slide.name}.png"))
+    sheet_path = os.path.join(output_dir, "contact_sheet.png")
+    contact_sheet(paths, columns).save(sheet_path)
+    print(f"🖼️  {len(paths)} slide previews ({rendered} rendered, {len(paths) - rendered} cached)")
+    print(f"✅ Contact sheet saved to: {sheet_path}")
+    return sheet_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render PNG previews and a contact sheet of a TALIJA deck")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("-o", "--output-dir", default=PREVIEWS_PATH, help="folder for the PNGs (default: previews/)")
+    parser.add_argument("-l", "--locales", metavar="LANGS", help="locale list, e.g. sr+en (default: the spec's locales)")
+    parser.add_argument("-w", "--width", type=int, default=PREVIEW_WIDTH,
+                        help=f"preview width in pixels (default: {PREVIEW_WIDTH})")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for rendering (default: 1)")
+    parser.add_argument("--columns", type=int, default=SHEET_COLUMNS,
+                        help=f"contact sheet columns (default: {SHEET_COLUMNS})")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        write_previews(args.spec, args.output_dir, args.locales.split("+") if args.locales else None,
+                       args.width, args.jobs, args.columns)
+    except SpecError as e:
+        sys.exit(f"❌ Invalid deck spec: {e}")
+    print(f"⏱️  {time.perf_counter() - start:.2f}s")
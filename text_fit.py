@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+TALIJA by Ranković - Text box autofit
+Measures text with font metrics memoised per (font, weight, glyph), wraps it the way
+PowerPoint does and flags, shrinks or grows text boxes whose text does not fit
+"""
+
+from arial_metrics import ARIAL, ARIAL_BOLD
+from dataclasses import replace
+from deck_spec import DEFAULT_SPEC, SpecError, Text, load_deck, slide_key
+from PIL import ImageFont
+import argparse
+import functools
+import os
+import re
+import sys
+import unicodedata
+
+# Text box geometry in points, as python-pptx creates it
+INSET_X = 7.2
+INSET_Y = 3.6
+LINE_SPACING = 1.2
+
+# Smallest size shrinking may reach, as a fraction of the spec's size
+SHRINK_LIMIT = 0.6
+
+# Shipped advance widths per (typeface, bold) in thousandths of an em; they take precedence
+# over installed fonts so the same spec fits to the same sizes on every machine
+METRIC_TABLES = {
+    ("Arial", False): ARIAL,
+    ("Arial", True): ARIAL_BOLD,
+}
+# Metric files per (typeface, bold) for characters outside the tables, best first, with a
+# width correction for stand-ins
+METRIC_FONTS = {
+    ("Arial", False): [("arial.ttf", 1.0), ("Arial.ttf", 1.0), ("LiberationSans-Regular.ttf", 1.0),
+                       ("DejaVuSans.ttf", 0.9)],
+    ("Arial", True): [("arialbd.ttf", 1.0), ("Arial Bold.ttf", 1.0), ("LiberationSans-Bold.ttf", 1.0),
+                      ("DejaVuSans-Bold.ttf", 0.9)],
+}
+# Fonts are loaded at this many pixels per em so advances come out in thousandths of an em
+UNITS_PER_EM = 1000
+# Advance in ems without a metric font; wide (CJK) characters, and symbols and private-use
+# characters missing from the tables (dingbats such as ✉, icon glyphs), are always one em
+FALLBACK_ADVANCE = 0.55
+
+# Break opportunities: runs of non-wide characters with their trailing spaces, or single wide ones
+TOKEN_PATTERN = re.compile(r"[^\s\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]+\s*|\S\s*|\s+")
+
+# Loaded metric fonts per (typeface, bold) as (ImageFont or None, correction)
+_fonts = {}
+# Advances in ems per (typeface, bold, glyph)
+_advances = {}
+# (typeface, bold) pairs already reported as measured without a metric table
+_reported = set()
+
+def metric_font(typeface, bold):
+    """(FreeType font, width correction) for measuring typeface, or (None, 1.0) if none is installed"""
+    key = (typeface, bold)
+    if key not in _fonts:
+        _fonts[key] = (None, 1.0)
+        candidates = METRIC_FONTS.get(key, [(f"{typeface}.ttf", 1.0)]) + METRIC_FONTS[("Arial", bold)]
+        for filename, correction in candidates:
+            try:
+                _fonts[key] = (ImageFont.truetype(filename, UNITS_PER_EM), correction)
+                break
+            except OSError:
+                continue
+    return _fonts[key]
+
+def advance(char, typeface="Arial", bold=False):
+    """Advance width of one character in ems"""
+    key = (typeface, bold, char)
+    width = _advances.get(key)
+    if width is None:
+        table = METRIC_TABLES.get((typeface, bold), {})
+        if char in table:
+            width = table[char] / UNITS_PER_EM
+        elif unicodedata.east_asian_width(char) in ("W", "F") or unicodedata.category(char) in ("So", "Co"):
+            width = 1.0
+        elif unicodedata.category(char) in ("Mn", "Me", "Cf"):
+            # Combining marks, variation selectors and joiners take no space of their own
+            width = 0.0
+        else:
+            font, correction = metric_font(typeface, bold)
+            width = font.getlength(char) * correction / UNITS_PER_EM if font else FALLBACK_ADVANCE
+            _report_metric_source(typeface, bold, font, char)
+        _advances[key] = width
+    return width
+
+def _report_metric_source(typeface, bold, font, char):
+    """Say once per typeface which host font measures text the metric tables do not cover"""
+    if (typeface, bold) in _reported:
+        return
+    _reported.add((typeface, bold))
+    source = os.path.basename(font.path) if font else f"a flat {FALLBACK_ADVANCE} em advance"
+    print(f"⚠️  Measuring {typeface}{' Bold' if bold else ''} text such as {char!r} with {source}; "
+          f"fitted sizes may differ on machines with other fonts", file=sys.stderr)
+
+def text_width(text, size, typeface="Arial", bold=False):
+    """Width of a single line of text in points"""
+    return sum(advance(c, typeface, bold) for c in text) * size
+
+@functools.lru_cache(maxsize=65536)
+def wrap_lines(text, size, width, typeface="Arial", bold=False):
+    """Lines text wraps to in a text box width inches wide, trailing spaces included"""
+    available = width * 72 - 2 * INSET_X
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        used = 0
+        for token in TOKEN_PATTERN.findall(paragraph):
+            token_width = text_width(token, size, typeface, bold)
+            # Spaces at the end of a line do not push it over the edge
+            fitting_width = text_width(token.rstrip(), size, typeface, bold)
+            if used and used + fitting_width > available:
+                lines.append(line)
+                line = ""
+                used = 0
+            if fitting_width > available:
+                # A word longer than the line breaks between characters
+                for char in token:
+                    char_width = text_width(char, size, typeface, bold)
+                    if used and used + char_width > available and not char.isspace():
+                        lines.append(line)
+                        line = ""
+                        used = 0
+                    line += char
+                    used += char_width
+                continue
+            line += token
+            used += token_width
+        lines.append(line)
+    return tuple(lines)
+
+def line_count(text, size, width, typeface="Arial", bold=False):
+    """Lines text wraps to in a text box width inches wide"""
+    return len(wrap_lines(text, size, width, typeface, bold))
+
+def line_capacity(size, height):
+    """Lines of size points a text box height inches tall shows; always at least one"""
+    # A quarter line of slack: descenders may dip into the bottom inset
+    return max(1, int((height * 72 - 2 * INSET_Y) / (size * LINE_SPACING) + 0.25))
+
+def text_height(lines, size):
+    """Height in inches of a text box showing lines lines of size points"""
+    return (lines * size * LINE_SPACING + 2 * INSET_Y) / 72
+
+def fit_text(element, mode):
+    """Fitted copy of a Text element and whether it still overflows its box
+
+    mode is "flag" (leave it), "shrink" (lower the font size down to SHRINK_LIMIT of
+    the original) or "grow" (make the box taller).
+    """
+    left, top, width, height = element.box
+    lines = line_count(element.text, element.size, width, element.font, element.bold)
+    if lines <= line_capacity(element.size, height):
+        return element, False
+    if mode == "shrink":
+        size = element.size
+        floor = element.size * SHRINK_LIMIT
+        while size - 1 >= floor and lines > line_capacity(size, height):
+            size -= 1
+            lines = line_count(element.text, size, width, element.font, element.bold)
+        return replace(element, size=size), lines > line_capacity(size, height)
+    if mode == "grow":
+        return replace(element, box=(left, top, width, round(text_height(lines, element.size), 3))), False
+    return element, True
+
+def fit_deck(deck):
+    """Apply the deck's autofit mode to every text box, as (deck, overflow messages)"""
+    if deck.autofit == "off":
+        return deck, []
+    messages = []
+    slides = []
+    for number, slide in enumerate(deck.slides, 1):
+        elements = []
+        for element in slide.elements:
+            if isinstance(element, Text):
+                fitted, overflows = fit_text(element, deck.autofit)
+                if overflows:
+                    lines = line_count(fitted.text, fitted.size, fitted.box[2], fitted.font, fitted.bold)
+                    messages.append(f"slide {number} {slide.name}: {fitted.text[:40]!r} wraps to {lines} "
+                                    f"lines, box fits {line_capacity(fitted.size, fitted.box[3])}")
+                if fitted is not element and fitted.box[1] + fitted.box[3] > deck.size[1]:
+                    messages.append(f"slide {number} {slide.name}: {fitted.text[:40]!r} runs off the slide")
+                element = fitted
+            elements.append(element)
+        elements = tuple(elements)
+        if elements != slide.elements:
+            slide = replace(slide, elements=elements)
+            slide = replace(slide, key=slide_key(slide))
+        slides.append(slide)
+    return replace(deck, slides=tuple(slides)), messages
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that every text box of a TALIJA deck fits its text")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="deck spec JSON")
+    parser.add_argument("-l", "--locales", nargs="+", metavar="LANGS",
+                        help="locale lists to check, e.g. sr+zh sr+en (default: the spec's locales)")
+    parser.add_argument("--mode", choices=("flag", "shrink", "grow"),
+                        help="autofit mode to check with (default: the spec's)")
+    args = parser.parse_args()
+    failures = 0
+    try:
+        for locales in args.locales or [None]:
+            deck = load_deck(args.spec, locales.split("+") if locales else None)
+            if args.mode:
+                deck = replace(deck, autofit=args.mode)
+            _, messages = fit_deck(deck)
+            label = "+".join(deck.locales)
+            for message in messages:
+                print(f"❌ {label} {message}")
+            failures += len(messages)
+            print(f"{'❌' if messages else '✅'} {label}: {len(messages)} overflowing text boxes")
+    except SpecError as e:
+        sys.exit(f"❌ Invalid deck spec: {e}")
+    sys.exit(1 if failures else 0)